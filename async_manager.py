@@ -0,0 +1,259 @@
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from contact_manager import ContactManager
+
+_STOP = object()
+
+
+class AsyncContactManager:
+    """asyncio front end for ContactManager that never blocks the event loop.
+
+    Reads run on a small thread pool, each thread with its own pooled
+    connection, so they proceed in parallel under WAL. Writes go through a
+    single writer thread: whatever has queued up while the previous commit
+    was running is applied as one transaction (a group commit), each write
+    inside its own savepoint so that one failing write doesn't take the
+    rest of its batch down with it. A write's coroutine returns only once
+    its batch has committed, so reads issued afterwards see it.
+
+    Use a database file; a ":memory:" database is a single shared
+    connection, so its reads are sent through the writer thread instead.
+    """
+
+    def __init__(self, db_path="contacts.db", readers=4, max_batch=256, **options):
+        self.max_batch = max_batch
+        self.cm = ContactManager(db_path, **options)
+        self._serial_reads = db_path == ":memory:"
+        self._readers = ThreadPoolExecutor(max_workers=readers,
+                                           thread_name_prefix="contacts-reader")
+        self._writes = queue.Queue()
+        self._closed = False
+        self._forwarders = {}
+        self.batches = 0
+        self.batched_writes = 0
+        self._writer = threading.Thread(target=self._run_writer,
+                                        name="contacts-writer", daemon=True)
+        self._writer.start()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Finish queued writes, stop the worker threads and close the database"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(_STOP)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.join)
+        await loop.run_in_executor(None, functools.partial(self._readers.shutdown, wait=True))
+        self.cm.close()
+
+    # -- plumbing -----------------------------------------------------------
+
+    async def run_read(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on a reader thread and await its result"""
+        if self._closed:
+            raise RuntimeError("AsyncContactManager is closed")
+        if self._serial_reads:
+            return await self._submit(func, args, kwargs, grouped=False)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers,
+                                          functools.partial(func, *args, **kwargs))
+
+    async def run_write(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the writer thread as part of the next
+        group commit and await its result. func may call any ContactManager
+        write methods; they all land in the same savepoint."""
+        return await self._submit(func, args, kwargs, grouped=True)
+
+    async def _submit(self, func, args, kwargs, grouped):
+        if self._closed:
+            raise RuntimeError("AsyncContactManager is closed")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put((functools.partial(func, *args, **kwargs), grouped, loop, future))
+        return await future
+
+    @staticmethod
+    def _resolve(loop, future, result=None, error=None):
+        def settle():
+            if future.cancelled():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        try:
+            loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass  # the caller's event loop has already shut down
+
+    def _run_writer(self):
+        while True:
+            job = self._writes.get()
+            if job is _STOP:
+                return
+            if not job[1]:
+                self._run_alone(job)
+                continue
+
+            batch = [job]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stop = True
+                    break
+                if not job[1]:
+                    # Keep queue order: commit what we have, then run it
+                    self._run_batch(batch)
+                    batch = []
+                    self._run_alone(job)
+                    continue
+                batch.append(job)
+            if batch:
+                self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_alone(self, job):
+        call, _, loop, future = job
+        try:
+            self._resolve(loop, future, call())
+        except Exception as e:
+            self._resolve(loop, future, error=e)
+
+    def _run_batch(self, batch):
+        outcomes = []
+        try:
+            with self.cm.transaction():
+                for call, _, _, _ in batch:
+                    try:
+                        with self.cm.savepoint():
+                            outcomes.append((call(), None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+        except Exception as e:
+            # The commit itself failed, so nothing in the batch was written
+            for _, _, loop, future in batch:
+                self._resolve(loop, future, error=e)
+            return
+
+        self.batches += 1
+        self.batched_writes += len(batch)
+        for (_, _, loop, future), (result, error) in zip(batch, outcomes):
+            self._resolve(loop, future, result, error)
+
+    # -- reads --------------------------------------------------------------
+
+    async def get_contact(self, contact_id):
+        return await self.run_read(self.cm.get_contact, contact_id)
+
+    async def get_all_contacts(self, columns=None):
+        return await self.run_read(self.cm.get_all_contacts, columns)
+
+    async def get_contacts_page(self, page_size=50, after=None, columns=None,
+                                filters=None, search=None, order_by='relevance_score',
+                                descending=True):
+        return await self.run_read(self.cm.get_contacts_page, page_size, after, columns,
+                                   filters, search, order_by, descending)
+
+    async def stream_contacts(self, page_size=500, columns=None, filters=None, search=None,
+                              order_by='relevance_score', descending=True):
+        """Async generator over contacts, fetching one keyset page per await"""
+        after = None
+        while True:
+            page = await self.get_contacts_page(page_size, after, columns, filters,
+                                                search, order_by, descending)
+            for row in page.rows:
+                yield row
+            if page.next_cursor is None:
+                break
+            after = page.next_cursor
+
+    async def count_contacts(self, filters=None, search=None):
+        return await self.run_read(self.cm.count_contacts, filters, search)
+
+    async def search_contacts(self, search_term, columns=None, limit=None):
+        return await self.run_read(self.cm.search_contacts, search_term, columns, limit)
+
+    async def fuzzy_search(self, search_term, limit=20, threshold=0.3, columns=None):
+        return await self.run_read(self.cm.fuzzy_search, search_term, limit, threshold,
+                                   columns)
+
+    async def find_duplicates(self, threshold=0.85, limit=None):
+        return await self.run_read(self.cm.find_duplicates, threshold, limit)
+
+    async def get_contact_history(self, contact_id):
+        return await self.run_read(self.cm.get_contact_history, contact_id)
+
+    async def export_file(self, path, fmt=None):
+        return await self.run_read(self.cm.export_file, path, fmt)
+
+    def cache_stats(self):
+        return self.cm.cache_stats()
+
+    def query_stats(self):
+        return self.cm.query_stats()
+
+    def group_commit_stats(self):
+        """How many group commits ran and how many writes they carried"""
+        return {
+            'batches': self.batches,
+            'writes': self.batched_writes,
+            'mean_batch': self.batched_writes / self.batches if self.batches else 0.0,
+        }
+
+    # -- writes -------------------------------------------------------------
+
+    async def add_contact(self, name, company, role, email="", linkedin_url="",
+                          relevance_score=1, notes="", status="New"):
+        return await self.run_write(self.cm.add_contact, name, company, role, email,
+                                    linkedin_url, relevance_score, notes, status)
+
+    async def update_contact(self, contact_id, **kwargs):
+        return await self.run_write(self.cm.update_contact, contact_id, **kwargs)
+
+    async def bulk_update(self, contact_ids, **fields):
+        return await self.run_write(self.cm.bulk_update, contact_ids, **fields)
+
+    async def delete_contact(self, contact_id):
+        return await self.run_write(self.cm.delete_contact, contact_id)
+
+    async def log_history(self, contact_id, action_type, notes=""):
+        return await self.run_write(self.cm.log_history, contact_id, action_type, notes)
+
+    async def import_contacts(self, records, chunk_size=1000):
+        """Bulk imports commit chunk by chunk on their own rather than
+        joining a group commit"""
+        return await self._submit(self.cm.import_contacts, (records, chunk_size), {},
+                                  grouped=False)
+
+    async def import_file(self, path, fmt=None, chunk_size=1000):
+        return await self._submit(self.cm.import_file, (path, fmt, chunk_size), {},
+                                  grouped=False)
+
+    # -- change events ------------------------------------------------------
+
+    def subscribe(self, listener):
+        """Deliver ChangeEvents to listener(events) on the calling event loop"""
+        loop = asyncio.get_running_loop()
+
+        def forward(events):
+            loop.call_soon_threadsafe(listener, events)
+        self._forwarders[listener] = forward
+        self.cm.subscribe(forward)
+
+    def unsubscribe(self, listener):
+        self.cm.unsubscribe(self._forwarders.pop(listener))
@@ -0,0 +1,716 @@
+"""Benchmark and load-test ContactManager against throwaway databases.
+
+Usage:
+    python benchmark.py pool [--ops N]
+    python benchmark.py suite [--sizes 1000 100000 1000000] [--output FILE]
+                              [--baseline FILE] [--data-dir DIR]
+    python benchmark.py async [--coroutines 500] [--ops 20]
+    python benchmark.py startup [--size 100000] [--runs 10]
+    python benchmark.py reports [--size 100000] [--processes 1 4]
+
+`pool` compares the pooled connection layer with per-call connections.
+`suite` builds synthetic datasets (reused from --data-dir when present),
+times every data path used by the CLI and GUI, runs concurrent readers and
+writers, and writes the results as JSON. With --baseline it also reports
+how each p50/p99 moved against an earlier run. `async` drives hundreds
+of concurrent coroutines through AsyncContactManager against a temporary
+database file and reports latencies and group-commit batching. `startup` times fresh processes: the CLI end to end, opening
+a current and a new database, and (with a display) the GUI up to its
+window appearing and its first page of contacts. Tk is only imported in
+that GUI child process. `reports` times the aggregate reports at each
+process count, and a writer's latency while idle, while reports run and
+while a backup is taken.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from async_manager import AsyncContactManager
+from contact_manager import ContactManager, SUMMARY_COLUMNS
+import reports
+
+
+class PerCallConnectionManager:
+    """Baseline that reproduces the old connect/execute/commit/close per call"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.setup_database()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def setup_database(self):
+        ContactManager(self.db_path).close()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+    def add_contact(self, name, company, role, email="", linkedin_url="",
+                   relevance_score=1, notes="", status="New"):
+        conn = self._connect()
+        cursor = conn.execute('''
+            INSERT INTO contacts (name, company, role, email, linkedin_url,
+                                relevance_score, notes, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (name, company, role, email, linkedin_url, relevance_score,
+              notes, status))
+        contact_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        self.log_history(contact_id, "Created", "Initial contact created")
+        return contact_id
+
+    def update_contact(self, contact_id, **kwargs):
+        conn = self._connect()
+        fields = ', '.join(f"{key} = ?" for key in kwargs)
+        conn.execute(f"UPDATE contacts SET {fields} WHERE id = ?",
+                     [*kwargs.values(), contact_id])
+        conn.commit()
+        conn.close()
+        self.log_history(contact_id, "Updated", f"Updated fields: {', '.join(kwargs.keys())}")
+
+    def search_contacts(self, search_term):
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT * FROM contacts
+            WHERE name LIKE ? OR company LIKE ? OR notes LIKE ?
+            ORDER BY relevance_score DESC
+        ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%')).fetchall()
+        conn.close()
+        return rows
+
+    def log_history(self, contact_id, action_type, notes=""):
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO contact_history (contact_id, action_type, notes)
+            VALUES (?, ?, ?)
+        ''', (contact_id, action_type, notes))
+        conn.commit()
+        conn.close()
+
+    def get_contact_history(self, contact_id):
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT action_type, action_date, notes
+            FROM contact_history
+            WHERE contact_id = ?
+            ORDER BY action_date DESC
+        ''', (contact_id,)).fetchall()
+        conn.close()
+        return rows
+
+
+def timed(label, ops, fn):
+    """Run fn(i) for i in range(ops) and print the achieved ops/sec"""
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    rate = ops / elapsed if elapsed else float('inf')
+    print(f"  {label:<10} {ops:>7} ops  {elapsed:8.3f}s  {rate:10.0f} ops/sec")
+    return rate
+
+
+def run_workload(cm, ops):
+    ids = []
+    results = {}
+    results['add'] = timed("add", ops, lambda i: ids.append(
+        cm.add_contact(f"Contact {i}", f"Company {i % 50}", "Engineer",
+                       relevance_score=i % 10 + 1, notes="benchmark")))
+    results['update'] = timed("update", ops, lambda i: cm.update_contact(
+        ids[i], relevance_score=(i + 3) % 10 + 1))
+    results['history'] = timed("history", ops, lambda i: cm.get_contact_history(ids[i]))
+    results['search'] = timed("search", max(ops // 10, 1),
+                              lambda i: cm.search_contacts(f"Company {i % 50}"))
+    return results
+
+
+def run_pool_comparison(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        print("Per-call connections (before):")
+        before = run_workload(PerCallConnectionManager(os.path.join(tmp, "before.db")), args.ops)
+
+        print("Pooled connection, WAL (after):")
+        with ContactManager(os.path.join(tmp, "after.db")) as cm:
+            after = run_workload(cm, args.ops)
+
+    print("Speedup:")
+    for name in before:
+        print(f"  {name:<10} {after[name] / before[name]:6.1f}x")
+
+
+# -- synthetic data -----------------------------------------------------------
+
+FIRST_NAMES = ('Ada', 'Grace', 'Alan', 'Barbara', 'Linus', 'Margaret', 'Dennis',
+               'Frances', 'Ken', 'Radia', 'Guido', 'Hedy', 'John', 'Sophie',
+               'Tim', 'Katherine', 'Edsger', 'Donald', 'Shafi', 'Leslie')
+LAST_NAMES = ('Lovelace', 'Hopper', 'Turing', 'Liskov', 'Torvalds', 'Hamilton',
+              'Ritchie', 'Allen', 'Thompson', 'Perlman', 'van Rossum', 'Lamarr',
+              'McCarthy', 'Wilson', 'Berners-Lee', 'Johnson', 'Dijkstra', 'Knuth',
+              'Goldwasser', 'Lamport')
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Vandelay',
+             'Stark Industries', 'Wayne Enterprises', 'Tyrell', 'Cyberdyne',
+             'Soylent', 'Wonka', 'Aperture', 'Black Mesa', 'Massive Dynamic')
+ROLES = ('Engineer', 'Director', 'CTO', 'Recruiter', 'Founder', 'Analyst',
+         'Product Manager', 'Designer', 'VP Sales', 'Researcher')
+NOTE_WORDS = ('met', 'conference', 'intro', 'follow', 'up', 'coffee', 'hiring',
+              'budget', 'quarter', 'demo', 'referral', 'podcast', 'launch',
+              'contract', 'renewal', 'pilot', 'roadmap', 'feedback')
+HISTORY_ACTIONS = ('Updated', 'Called', 'Emailed', 'Met', 'Note')
+
+
+def synthetic_contact(rng, i):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    company = f"{rng.choice(COMPANIES)} {rng.randint(1, 500)}"
+    return {
+        'name': f"{first} {last} {i}",
+        'company': company,
+        'role': rng.choice(ROLES),
+        'email': f"{first.lower()}.{i}@{company.split()[0].lower()}.example",
+        'linkedin_url': f"https://linkedin.example/in/{first.lower()}-{i}",
+        'relevance_score': rng.randint(1, 10),
+        'notes': ' '.join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(5, 60))),
+        'status': rng.choice(('New', 'Contacted', 'Qualified', 'Closed')),
+    }
+
+
+def synthetic_history(rng, size, fanout):
+    """Yield history rows with on average `fanout` entries per contact"""
+    now = datetime.now()
+    for contact_id in range(1, size + 1):
+        for _ in range(rng.randint(0, 2 * fanout)):
+            when = now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+            yield (contact_id, rng.choice(HISTORY_ACTIONS),
+                   when.strftime('%Y-%m-%d %H:%M:%S'),
+                   ' '.join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(2, 12))))
+
+
+def build_dataset(path, size, fanout, seed=0):
+    """Create a database with `size` contacts and their history fan-out"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    with ContactManager(path, cache_size=0) as cm:
+        cm.import_contacts(((i, synthetic_contact(rng, i)) for i in range(size)),
+                           chunk_size=10000)
+        history = synthetic_history(rng, size, fanout)
+        while True:
+            chunk = [row for _, row in zip(range(50000), history)]
+            if not chunk:
+                break
+            with cm.transaction() as conn:
+                conn.executemany('''
+                    INSERT INTO contact_history (contact_id, action_type, action_date, notes)
+                    VALUES (?, ?, ?, ?)
+                ''', chunk)
+        cm.pool.get().execute("ANALYZE")
+    print(f"  built {size} contacts in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+# -- measurement --------------------------------------------------------------
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def summarize(latencies, elapsed=None):
+    """Latency distribution in milliseconds plus throughput"""
+    values = sorted(latencies)
+    elapsed = elapsed if elapsed is not None else sum(values)
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'max_ms': (values[-1] if values else 0.0) * 1000,
+        'mean_ms': (sum(values) / len(values) * 1000) if values else 0.0,
+        'ops_per_sec': len(values) / elapsed if elapsed else 0.0,
+    }
+
+
+def typo(rng, word):
+    """Drop, double or swap one character"""
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def measure(ops, fn):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(ops):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_operations(cm, size, ops, rng):
+    """Time each ContactManager data path against a populated database"""
+    ids = [rng.randint(1, size) for _ in range(ops)]
+    terms = [rng.choice(LAST_NAMES).split()[-1][:rng.randint(3, 6)] for _ in range(ops)]
+    companies = [rng.choice(COMPANIES) for _ in range(ops)]
+    typos = [typo(rng, rng.choice(LAST_NAMES + COMPANIES)) for _ in range(ops)]
+    cursors = []
+    for contact_id in ids[:max(ops // 10, 1)]:
+        contact = cm.get_contact(contact_id)
+        if contact is not None:
+            cursors.append((contact.relevance_score, contact.id))
+    list_columns = SUMMARY_COLUMNS
+
+    results = {}
+    results['add'] = measure(ops, lambda i: cm.add_contact(
+        f"Bench {i}", companies[i], "Engineer", relevance_score=i % 10 + 1, notes="benchmark"))
+    results['update'] = measure(ops, lambda i: cm.update_contact(
+        ids[i], relevance_score=i % 10 + 1))
+    # The GUI saving a form nobody edited
+    results['update_noop'] = measure(ops, lambda i: cm.update_contact(
+        ids[i], relevance_score=i % 10 + 1))
+    results['bulk_update'] = measure(1, lambda i: cm.bulk_update(ids, relevance_score=5))
+    results['get'] = measure(ops, lambda i: cm.get_contact(ids[i]))
+    results['history'] = measure(ops, lambda i: cm.get_contact_history(ids[i]))
+    results['search'] = measure(ops, lambda i: cm.search_contacts(terms[i]))
+    results['search_summary'] = measure(ops, lambda i: cm.search_contacts(
+        terms[i], columns=list_columns))
+    results['fuzzy_build'] = measure(1, lambda i: cm.rebuild_fuzzy_index())
+    results['fuzzy_search'] = measure(ops, lambda i: cm.fuzzy_search(
+        typos[i], columns=list_columns))
+    results['list_first_page'] = measure(ops, lambda i: cm.get_contacts_page(
+        50, columns=list_columns))
+    results['list_deep_page'] = measure(len(cursors), lambda i: cm.get_contacts_page(
+        50, after=cursors[i], columns=list_columns))
+    results['search_page'] = measure(ops, lambda i: cm.get_contacts_page(
+        50, columns=list_columns, search=terms[i]))
+    results['summary'] = measure(ops, lambda i: cm.get_summary())
+    # An incremental sync that is 100 changes behind
+    behind = cm.last_change_seq() - 100
+    results['sync_delta'] = measure(ops, lambda i: list(cm.changes_since(behind)))
+    # Each contact can only be deleted once
+    doomed = list(dict.fromkeys(ids))
+    results['delete'] = measure(len(doomed), lambda i: cm.delete_contact(doomed[i]))
+    return results
+
+
+def existing_ids(cm):
+    """Ids of the contacts still in the database; earlier steps delete some,
+    and update_contact raises LookupError for those"""
+    return [row[0] for row in cm.pool.get().execute("SELECT id FROM contacts")]
+
+
+def run_concurrent(cm, readers, writers, duration):
+    """Run reader and writer threads against one ContactManager for
+    `duration` seconds and report per-role latency and lock errors"""
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    ids = existing_ids(cm)
+
+    def worker(role, seed):
+        rng = random.Random(seed)
+        local = []
+        failures = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                if role == 'write':
+                    cm.update_contact(rng.choice(ids), relevance_score=rng.randint(1, 10))
+                elif rng.random() < 0.5:
+                    cm.search_contacts(rng.choice(LAST_NAMES)[:4])
+                else:
+                    cm.get_contacts_page(50, columns=('id', 'name', 'company', 'relevance_score'))
+            except sqlite3.OperationalError:
+                failures += 1
+                continue
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies[role].extend(local)
+            errors[role] += failures
+
+    threads = [threading.Thread(target=worker, args=('read', n)) for n in range(readers)]
+    threads += [threading.Thread(target=worker, args=('write', 1000 + n)) for n in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'readers': readers,
+        'writers': writers,
+        'duration_s': elapsed,
+        'read': dict(summarize(latencies['read'], elapsed), errors=errors['read']),
+        'write': dict(summarize(latencies['write'], elapsed), errors=errors['write']),
+    }
+
+
+def compare(results, baseline):
+    """Print the p50/p99 ratio of every operation against a baseline run"""
+    print("\nAgainst baseline (ratio > 1 is slower):")
+    for size, dataset in results['datasets'].items():
+        previous = baseline.get('datasets', {}).get(size)
+        if not previous:
+            continue
+        for name, current in dataset['operations'].items():
+            before = previous['operations'].get(name)
+            if not before or not before['p50_ms'] or not before['p99_ms']:
+                continue
+            p50 = current['p50_ms'] / before['p50_ms']
+            p99 = current['p99_ms'] / before['p99_ms']
+            flag = "  REGRESSION" if p50 > 1.2 or p99 > 1.5 else ""
+            print(f"  {size:>8} {name:<16} p50 x{p50:5.2f}  p99 x{p99:5.2f}{flag}")
+
+
+def run_suite(args):
+    rng = random.Random(args.seed)
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'ops': args.ops,
+            'history_fanout': args.fanout,
+        },
+        'datasets': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for size in args.sizes:
+            source = os.path.join(data_dir, f"contacts_{size}_{args.fanout}.db")
+            if not os.path.exists(source):
+                build_dataset(source, size, args.fanout, args.seed)
+
+            # Measure a copy so a cached dataset stays pristine between runs
+            work = os.path.join(tmp, f"work_{size}.db")
+            with sqlite3.connect(source) as src, sqlite3.connect(work) as dst:
+                src.backup(dst)
+
+            print(f"{size} contacts:", file=sys.stderr)
+            with ContactManager(work, cache_size=args.cache_size) as cm:
+                operations = run_operations(cm, size, min(args.ops, size), rng)
+                concurrent = run_concurrent(cm, args.readers, args.writers, args.duration)
+            for name, stats in operations.items():
+                print(f"  {name:<16} p50 {stats['p50_ms']:8.3f}ms  p99 {stats['p99_ms']:8.3f}ms"
+                      f"  {stats['ops_per_sec']:10.0f} ops/sec", file=sys.stderr)
+            for role in ('read', 'write'):
+                stats = concurrent[role]
+                print(f"  concurrent {role:<5} p50 {stats['p50_ms']:8.3f}ms  p99 {stats['p99_ms']:8.3f}ms"
+                      f"  {stats['ops_per_sec']:10.0f} ops/sec  {stats['errors']} errors",
+                      file=sys.stderr)
+            results['datasets'][str(size)] = {'operations': operations, 'concurrent': concurrent}
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(results, json.load(handle))
+
+
+async def drive_async(path, coroutines, ops, readers):
+    """Each coroutine adds a contact, then interleaves updates and reads of
+    it with other coroutines' traffic; returns the latencies per role.
+    Correctness under this load is covered by tests/test_async_manager.py."""
+    latencies = {'read': [], 'write': []}
+
+    async with AsyncContactManager(path, readers=readers) as acm:
+        async def client(n):
+            rng = random.Random(n)
+            t0 = time.perf_counter()
+            contact_id = await acm.add_contact(f"Async {n}", rng.choice(COMPANIES),
+                                               rng.choice(ROLES), relevance_score=1)
+            latencies['write'].append(time.perf_counter() - t0)
+            for i in range(ops):
+                t0 = time.perf_counter()
+                if i % 2:
+                    await acm.update_contact(contact_id, relevance_score=i % 10 + 1)
+                    latencies['write'].append(time.perf_counter() - t0)
+                else:
+                    await acm.get_contact(contact_id)
+                    await acm.get_contacts_page(50, columns=('id', 'name'))
+                    latencies['read'].append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(coroutines)))
+        elapsed = time.perf_counter() - start
+        return elapsed, latencies, acm.group_commit_stats()
+
+
+def run_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "async.db")
+        elapsed, latencies, batching = asyncio.run(
+            drive_async(path, args.coroutines, args.ops, args.readers))
+
+    print(f"{args.coroutines} coroutines x {args.ops} ops in {elapsed:.3f}s")
+    for role in ('read', 'write'):
+        stats = summarize(latencies[role], elapsed)
+        print(f"  {role:<6} p50 {stats['p50_ms']:8.3f}ms  p99 {stats['p99_ms']:8.3f}ms"
+              f"  {stats['ops_per_sec']:10.0f} ops/sec")
+    print(f"  group commits: {batching['batches']} for {batching['writes']} writes"
+          f" ({batching['mean_batch']:.1f} per commit)")
+
+
+# -- startup ------------------------------------------------------------------
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a child process: times from interpreter start to the GUI's window
+# being mapped and to the first page of contacts being on screen
+GUI_PROBE = '''
+import sys, time
+start = time.perf_counter()
+import tkinter as tk
+import gui
+imported = time.perf_counter()
+root = tk.Tk()
+app = gui.ContactManagerGUI(root, sys.argv[1])
+marks = {'built': time.perf_counter()}
+
+def mapped(event):
+    marks.setdefault('window', time.perf_counter())
+
+def poll():
+    if app.contact_tree.get_children():
+        marks['first_page'] = time.perf_counter()
+        app.on_close()
+    else:
+        root.after(1, poll)
+
+root.bind('<Map>', mapped)
+root.after(1, poll)
+root.mainloop()
+print(imported - start, marks['built'] - start, marks.get('window', marks['built']) - start,
+      marks['first_page'] - start)
+'''
+
+
+def time_process(argv, runs):
+    """Wall-clock latencies of running argv to completion `runs` times"""
+    latencies = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(argv, cwd=REPO_DIR, check=True, stdout=subprocess.DEVNULL)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies)
+
+
+def time_gui(path, runs):
+    """Per-phase GUI startup latencies, or None without a display"""
+    phases = {'import': [], 'constructed': [], 'window': [], 'first_page': []}
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, '-c', GUI_PROBE, path], cwd=REPO_DIR,
+                               capture_output=True, text=True)
+        if probe.returncode != 0:
+            if 'TclError' in probe.stderr:
+                return None
+            raise RuntimeError(probe.stderr)
+        for phase, value in zip(phases, probe.stdout.split()):
+            phases[phase].append(float(value))
+    return {phase: summarize(values) for phase, values in phases.items()}
+
+
+def run_startup(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        path = os.path.join(data_dir, f"contacts_{args.size}_1.db")
+        if not os.path.exists(path):
+            build_dataset(path, args.size, 1)
+
+        results = {}
+        results['python'] = time_process([sys.executable, '-c', 'pass'], args.runs)
+        results['import contact_manager'] = time_process(
+            [sys.executable, '-c', 'import contact_manager'], args.runs)
+        cli = [sys.executable, 'cli.py', '--db', path]
+        results['cli list --limit 1'] = time_process(
+            cli + ['list', '--limit', '1', '--format', 'jsonl'], args.runs)
+        results['cli search'] = time_process(
+            cli + ['search', 'Hopper', '--limit', '5', '--format', 'jsonl'], args.runs)
+
+        # In-process: opening an existing, current database...
+        latencies = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            ContactManager(path).close()
+            latencies.append(time.perf_counter() - t0)
+        results['open current schema'] = summarize(latencies)
+        # ...and creating a new one, which runs every migration
+        latencies = []
+        for i in range(args.runs):
+            t0 = time.perf_counter()
+            ContactManager(os.path.join(tmp, f"new_{i}.db")).close()
+            latencies.append(time.perf_counter() - t0)
+        results['create new database'] = summarize(latencies)
+
+        gui = time_gui(path, args.runs)
+
+    print(f"Startup, {args.size} contacts, {args.runs} runs each:")
+    for name, stats in results.items():
+        print(f"  {name:<24} p50 {stats['p50_ms']:8.1f}ms  max {stats['max_ms']:8.1f}ms")
+    if gui is None:
+        print("  gui                      skipped (no display)")
+    else:
+        for phase, stats in gui.items():
+            print(f"  gui {phase:<20} p50 {stats['p50_ms']:8.1f}ms  max {stats['max_ms']:8.1f}ms")
+
+
+# -- reports ------------------------------------------------------------------
+
+def time_writer(cm, duration, background=None):
+    """Latencies of back-to-back updates from a writer thread for
+    `duration` seconds, while background() runs repeatedly on this one"""
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    ids = existing_ids(cm)
+
+    def writer():
+        rng = random.Random(0)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                cm.update_contact(rng.choice(ids), relevance_score=rng.randint(1, 10))
+            except sqlite3.OperationalError:
+                errors.append(1)
+                continue
+            latencies.append(time.perf_counter() - t0)
+
+    thread = threading.Thread(target=writer)
+    start = time.perf_counter()
+    thread.start()
+    rounds = 0
+    while time.perf_counter() - start < duration:
+        if background is None:
+            time.sleep(0.01)
+        else:
+            background()
+            rounds += 1
+    stop.set()
+    thread.join()
+    elapsed = time.perf_counter() - start
+    return dict(summarize(latencies, elapsed), errors=len(errors), rounds=rounds)
+
+
+def run_reports(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        path = os.path.join(data_dir, f"contacts_{args.size}_1.db")
+        if not os.path.exists(path):
+            build_dataset(path, args.size, 1)
+
+        print(f"Reports over {args.size} contacts ({os.cpu_count()} CPUs), p50 of {args.runs} runs:")
+        for processes in args.processes:
+            for name in reports.REPORTS:
+                latencies = [reports.run_report(path, name, processes).elapsed
+                             for _ in range(args.runs)]
+                stats = summarize(latencies)
+                print(f"  {name:<10} {processes:>2} processes  p50 {stats['p50_ms']:8.1f}ms"
+                      f"  max {stats['max_ms']:8.1f}ms")
+
+        with ContactManager(path) as cm:
+            loads = {'idle': None}
+            for processes in args.processes:
+                loads[f"reports x{processes}"] = (
+                    lambda processes=processes: [reports.run_report(path, name, processes)
+                                                 for name in reports.REPORTS])
+            copy = os.path.join(tmp, "backup.db")
+            loads['backup'] = lambda: cm.backup(copy)
+
+            print(f"\nWriter latency over {args.duration:.0f}s:")
+            for label, load in loads.items():
+                stats = time_writer(cm, args.duration, load)
+                print(f"  {label:<14} p50 {stats['p50_ms']:7.3f}ms  p99 {stats['p99_ms']:7.3f}ms"
+                      f"  max {stats['max_ms']:8.3f}ms  {stats['ops_per_sec']:7.0f} writes/sec"
+                      f"  errors {stats['errors']}  load rounds {stats['rounds']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pool_parser = subparsers.add_parser('pool', help="pooled vs per-call connections")
+    pool_parser.add_argument('--ops', type=int, default=2000,
+                             help="operations per measured step (default: 2000)")
+    pool_parser.set_defaults(handler=run_pool_comparison)
+
+    suite_parser = subparsers.add_parser('suite', help="latency/throughput suite over synthetic datasets")
+    suite_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                              help="contact counts to test (default: 1000 100000 1000000)")
+    suite_parser.add_argument('--fanout', type=int, default=5,
+                              help="average history entries per contact (default: 5)")
+    suite_parser.add_argument('--ops', type=int, default=1000,
+                              help="operations per measured path (default: 1000)")
+    suite_parser.add_argument('--readers', type=int, default=4)
+    suite_parser.add_argument('--writers', type=int, default=1)
+    suite_parser.add_argument('--duration', type=float, default=5.0,
+                              help="seconds of concurrent load per dataset (default: 5)")
+    suite_parser.add_argument('--cache-size', type=int, default=0,
+                              help="ContactManager LRU size; 0 measures the database path (default: 0)")
+    suite_parser.add_argument('--data-dir', help="keep generated datasets here and reuse them")
+    suite_parser.add_argument('--seed', type=int, default=0)
+    suite_parser.add_argument('--output', default="bench_results.json",
+                              help="JSON results file, or - for stdout (default: bench_results.json)")
+    suite_parser.add_argument('--baseline', help="earlier results file to compare against")
+    suite_parser.set_defaults(handler=run_suite)
+
+    async_parser = subparsers.add_parser('async', help="concurrent coroutines through AsyncContactManager")
+    async_parser.add_argument('--coroutines', type=int, default=500)
+    async_parser.add_argument('--ops', type=int, default=20,
+                              help="operations per coroutine after its insert (default: 20)")
+    async_parser.add_argument('--readers', type=int, default=4)
+    async_parser.set_defaults(handler=run_async)
+
+    startup_parser = subparsers.add_parser('startup', help="process start-up time of the CLI and GUI")
+    startup_parser.add_argument('--size', type=int, default=100000,
+                                help="contacts in the database opened (default: 100000)")
+    startup_parser.add_argument('--runs', type=int, default=10,
+                                help="launches per measurement (default: 10)")
+    startup_parser.add_argument('--data-dir', help="keep the generated database here and reuse it")
+    startup_parser.set_defaults(handler=run_startup)
+
+    reports_parser = subparsers.add_parser('reports', help="report fan-out and writer latency under reports")
+    reports_parser.add_argument('--size', type=int, default=100000,
+                                help="contacts in the database (default: 100000)")
+    reports_parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                                help="process counts to compare (default: 1 and one per CPU)")
+    reports_parser.add_argument('--runs', type=int, default=5,
+                                help="runs of each report (default: 5)")
+    reports_parser.add_argument('--duration', type=float, default=5.0,
+                                help="seconds of writes per load (default: 5)")
+    reports_parser.add_argument('--data-dir', help="keep the generated database here and reuse it")
+    reports_parser.set_defaults(handler=run_reports)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import csv
+import json
+import os
+import sys
+
+FORMATS = ('csv', 'tsv', 'jsonl')
+
+# Field separator of the delimited formats
+DELIMITERS = {'csv': ',', 'tsv': '\t'}
+
+
+def detect_format(path, fmt=None):
+    """Pick the file format from an explicit choice or the file extension"""
+    if fmt:
+        fmt = fmt.lower()
+    else:
+        ext = os.path.splitext(path)[1].lower().lstrip('.')
+        fmt = {'json': 'jsonl', 'ndjson': 'jsonl'}.get(ext, ext)
+    if not fmt:
+        raise ValueError(f"Cannot infer a format from {path!r}; pass one explicitly")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def read_records(path, fmt=None):
+    """Stream (line_number, record_dict) pairs from a CSV, TSV or JSONL file.
+
+    Malformed JSON lines are yielded as (line_number, ValueError) so the
+    caller can report them alongside validation errors and carry on.
+    """
+    fmt = detect_format(path, fmt)
+    handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt in DELIMITERS:
+            reader = csv.DictReader(handle, delimiter=DELIMITERS[fmt])
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, ValueError(f"invalid JSON: {e.msg}")
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, ValueError("expected a JSON object")
+                    continue
+                yield line_number, record
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def write_records(rows, columns, handle, fmt):
+    """Write tuples from an iterator one at a time; returns the row count"""
+    count = 0
+    if fmt in DELIMITERS:
+        writer = csv.writer(handle, delimiter=DELIMITERS[fmt])
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            handle.write(json.dumps(dict(zip(columns, row))) + '\n')
+            count += 1
+    return count
@@ -0,0 +1,110 @@
+"""Change log of every write to contacts, for incremental sync.
+
+contact_changes gets one row per inserted, updated or deleted contact,
+written by triggers in the writer's own transaction:
+  * insert: `after` holds the whole new row,
+  * update: `before` and `after` hold only the columns that changed,
+  * delete: `before` holds the whole old row,
+each as a JSON object keyed by column name.
+
+seq is an AUTOINCREMENT key, so it only ever grows and is never reused,
+even after old rows are trimmed. A writer holds the database's write lock
+from its first write until it commits, so seq order is commit order: a
+reader that has seen everything up to some seq can never have a lower seq
+commit after it. A consumer keeps the last seq it applied and asks for what came
+after it, which costs a range scan of the primary key no matter how big
+contacts is.
+
+When the log is created it is seeded with an insert for every existing
+contact, so replaying it from the start rebuilds the table.
+"""
+from collections import namedtuple
+
+from contact_record import CONTACT_COLUMNS
+
+# One logged change; before and after are dicts (None where not logged)
+Change = namedtuple('Change', ['seq', 'contact_id', 'op', 'changed_at', 'before', 'after'])
+
+# Columns of contact_changes, in Change order
+CHANGE_COLUMNS = ('seq', 'contact_id', 'op', 'changed_at', 'before', 'after')
+
+
+def _row_json(row):
+    fields = ', '.join(f"'{column}', {row}.{column}" for column in CONTACT_COLUMNS)
+    return f"json_object({fields})"
+
+
+def create_change_log(cursor):
+    """Create contact_changes and its triggers, and log every existing
+    contact as inserted"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contact_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            contact_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            before TEXT,
+            after TEXT
+        )
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS contacts_changes_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contact_changes (contact_id, op, after)
+            VALUES (new.id, 'insert', {_row_json('new')});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS contacts_changes_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contact_changes (contact_id, op, before)
+            VALUES (old.id, 'delete', {_row_json('old')});
+        END
+    ''')
+    # Only the columns whose value changed go into before/after, and an
+    # UPDATE that changes nothing isn't logged at all
+    changed = ' OR '.join(f"old.{column} IS NOT new.{column}" for column in CONTACT_COLUMNS)
+    pairs = ' UNION ALL '.join(
+        f"SELECT '{column}' AS name, old.{column} AS old_value, new.{column} AS new_value"
+        for column in CONTACT_COLUMNS)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS contacts_changes_update AFTER UPDATE ON contacts
+        WHEN {changed} BEGIN
+            INSERT INTO contact_changes (contact_id, op, before, after)
+            SELECT new.id, 'update', json_group_object(name, old_value),
+                   json_group_object(name, new_value)
+            FROM ({pairs})
+            WHERE old_value IS NOT new_value;
+        END
+    ''')
+
+    cursor.execute(f'''
+        INSERT INTO contact_changes (contact_id, op, after)
+        SELECT id, 'insert', {_row_json('contacts')} FROM contacts ORDER BY id
+    ''')
+
+
+def decode(row):
+    """Change from a contact_changes row selected as CHANGE_COLUMNS"""
+    # Only the sync path pays for json
+    import json
+    seq, contact_id, op, changed_at, before, after = row
+    return Change(seq, contact_id, op, changed_at,
+                  json.loads(before) if before is not None else None,
+                  json.loads(after) if after is not None else None)
+
+
+def oldest_seq(conn):
+    """The first seq still in the log: everything from here on can be
+    replayed. Past the newest seq when the log is empty."""
+    return conn.execute('''
+        SELECT COALESCE((SELECT MIN(seq) FROM contact_changes),
+                        (SELECT seq + 1 FROM sqlite_sequence WHERE name = 'contact_changes'),
+                        1)
+    ''').fetchone()[0]
+
+
+def last_seq(conn):
+    """The newest seq handed out, or 0 before the first change"""
+    return conn.execute('''
+        SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'contact_changes'), 0)
+    ''').fetchone()[0]
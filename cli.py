@@ -1,6 +1,37 @@
-from contact_manager import ContactManager
+from contact_manager import ContactManager, CONTACT_COLUMNS, SUMMARY_COLUMNS
+from itertools import islice
+import argparse
+import os
+import sqlite3
 import sys
 
+# Columns printed by the interactive listing
+LISTING_COLUMNS = ('id', 'name', 'company', 'role', 'email', 'linkedin_url',
+                   'relevance_score', 'notes')
+
+# bulk_io.FORMATS, spelled out so parsing arguments doesn't import
+# bulk_io (and with it csv and json); only the commands that read or write
+# files do
+FILE_FORMATS = ('csv', 'tsv', 'jsonl')
+
+# Output formats of the scriptable commands; 'table' is for people, the
+# others are written with bulk_io, one row at a time
+OUTPUT_FORMATS = ('table',) + FILE_FORMATS
+
+# Column widths in table output (anything else gets DEFAULT_WIDTH)
+TABLE_WIDTHS = {'id': 6, 'line': 6, 'op': 8, 'relevance_score': 5, 'score': 5,
+                'status': 10, 'action_type': 10, 'action_date': 19,
+                'last_contact_date': 10, 'follow_up_date': 10, 'created_at': 19}
+DEFAULT_WIDTH = 24
+
+HISTORY_COLUMNS = ('action_type', 'action_date', 'notes')
+
+BATCH_COLUMNS = ('line', 'op', 'id', 'result')
+
+# Fields the add/update commands and batch operations may set
+CONTACT_FIELDS = ('name', 'company', 'role', 'email', 'linkedin_url',
+                  'relevance_score', 'notes', 'status')
+
 def print_menu():
     print("\nContact Manager Menu:")
     print("1. Add new contact")
@@ -29,9 +60,664 @@ def get_contact_info():
     notes = input("Notes: ")
     return name, company, role, email, linkedin, relevance, notes
 
-def main():
-    cm = ContactManager()
-    
+def parse_columns(value):
+    columns = tuple(column.strip() for column in value.split(',') if column.strip())
+    for column in columns:
+        if column not in CONTACT_COLUMNS:
+            raise argparse.ArgumentTypeError(
+                f"unknown column {column!r}; expected some of {', '.join(CONTACT_COLUMNS)}")
+    return columns
+
+def parse_score(value):
+    try:
+        score = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid score {value!r}")
+    if not 1 <= score <= 10:
+        raise argparse.ArgumentTypeError(f"score {score} is not between 1 and 10")
+    return score
+
+def format_cell(value, width):
+    if value is None:
+        text = ''
+    elif isinstance(value, float):
+        text = f"{value:.2f}"
+    else:
+        text = str(value).replace('\n', ' ')
+    return f"{text[:width]:<{width}}"
+
+def write_rows(rows, columns, fmt):
+    """Print tuples in `columns` order as they arrive; returns the count"""
+    if fmt != 'table':
+        import bulk_io
+        return bulk_io.write_records(rows, columns, sys.stdout, fmt)
+    widths = [TABLE_WIDTHS.get(column, DEFAULT_WIDTH) for column in columns]
+    print('  '.join(format_cell(column, width) for column, width in zip(columns, widths)).rstrip())
+    count = 0
+    for row in rows:
+        print('  '.join(format_cell(value, width) for value, width in zip(row, widths)).rstrip())
+        count += 1
+    return count
+
+def contact_rows(contacts, columns):
+    for contact in contacts:
+        yield tuple(getattr(contact, column) for column in columns)
+
+def contact_fields(args):
+    """The contact fields given on the command line"""
+    return {field: getattr(args, field) for field in CONTACT_FIELDS
+            if getattr(args, field, None) is not None}
+
+def require_contact(cm, contact_id):
+    if cm.get_contact(contact_id) is None:
+        raise LookupError(f"No contact with id {contact_id}")
+
+def add_command(cm, args):
+    fields = contact_fields(args)
+    fields.setdefault('company', '')
+    fields.setdefault('role', '')
+    contact_id = cm.add_contact(**fields)
+    write_rows([(contact_id,)], ('id',), args.format)
+    return 0
+
+def list_command(cm, args):
+    filters = {}
+    if args.status:
+        filters['status'] = args.status
+    if args.min_score is not None:
+        filters['relevance_score'] = ('>=', args.min_score)
+    rows = cm.stream_contacts(columns=args.columns, filters=filters, search=args.search,
+                              order_by=args.order_by, descending=not args.ascending)
+    write_rows(islice(rows, args.limit), args.columns, args.format)
+    return 0
+
+def search_command(cm, args):
+    if args.fuzzy:
+        found = cm.fuzzy_search(args.term, args.limit or 20, args.threshold, args.columns)
+        rows = (row + (score,) for row, score in
+                zip(contact_rows((contact for contact, _ in found), args.columns),
+                    (score for _, score in found)))
+        count = write_rows(rows, args.columns + ('score',), args.format)
+    else:
+        contacts = cm.search_contacts(args.term, args.columns, args.limit)
+        count = write_rows(contact_rows(contacts, args.columns), args.columns, args.format)
+    return 0 if count else 1
+
+def update_command(cm, args):
+    fields = contact_fields(args)
+    if not fields:
+        raise ValueError("Nothing to update; pass at least one field")
+    changed = cm.update_contact(args.id, **fields)
+    print(f"Updated {', '.join(changed)}" if changed else "No changes", file=sys.stderr)
+    return 0
+
+def bulk_update_command(cm, args):
+    fields = contact_fields(args)
+    if not fields:
+        raise ValueError("Nothing to update; pass at least one field")
+    changed = cm.bulk_update(args.ids, **fields)
+    print(f"Updated {len(changed)} of {len(args.ids)} contacts", file=sys.stderr)
+    return 0
+
+def delete_command(cm, args):
+    missing = []
+    with cm.transaction():
+        for contact_id in args.ids:
+            try:
+                cm.delete_contact(contact_id)
+            except LookupError:
+                missing.append(contact_id)
+    for contact_id in missing:
+        print(f"No contact with id {contact_id}", file=sys.stderr)
+    print(f"Deleted {len(args.ids) - len(missing)} contacts", file=sys.stderr)
+    return 1 if missing else 0
+
+def history_command(cm, args):
+    require_contact(cm, args.id)
+    write_rows(cm.get_contact_history(args.id), HISTORY_COLUMNS, args.format)
+    return 0
+
+def batch_fields(record):
+    fields = {key: value for key, value in record.items() if key not in ('op', 'id', 'ids')}
+    unknown = set(fields) - set(CONTACT_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(sorted(unknown))}")
+    return fields
+
+def batch_add(cm, record):
+    fields = batch_fields(record)
+    if not fields.get('name'):
+        raise ValueError("name is required")
+    fields.setdefault('company', '')
+    fields.setdefault('role', '')
+    return cm.add_contact(**fields), 'added'
+
+def batch_update(cm, record):
+    fields = batch_fields(record)
+    if not fields:
+        raise ValueError("nothing to update")
+    changed = cm.update_contact(record['id'], **fields)
+    return record['id'], 'updated' if changed else 'unchanged'
+
+def batch_bulk_update(cm, record):
+    fields = batch_fields(record)
+    if not fields:
+        raise ValueError("nothing to update")
+    return None, f"updated {len(cm.bulk_update(record['ids'], **fields))}"
+
+def batch_delete(cm, record):
+    cm.delete_contact(record['id'])
+    return record['id'], 'deleted'
+
+def batch_log(cm, record):
+    require_contact(cm, record['id'])
+    cm.log_history(record['id'], record.get('action') or 'Note', record.get('notes') or '')
+    return record['id'], 'logged'
+
+def batch_snooze(cm, record):
+    return None, f"snoozed {cm.snooze(record['ids'], record.get('days', 1))}"
+
+def batch_reschedule(cm, record):
+    return None, f"rescheduled {cm.reschedule(record['ids'], record.get('date'))}"
+
+# Operations a batch file may contain, keyed by their "op" value
+BATCH_OPERATIONS = {
+    'add': batch_add,
+    'update': batch_update,
+    'bulk_update': batch_bulk_update,
+    'delete': batch_delete,
+    'log': batch_log,
+    'snooze': batch_snooze,
+    'reschedule': batch_reschedule,
+}
+
+def run_batch_operation(cm, record):
+    if isinstance(record, Exception):
+        raise record
+    operation = BATCH_OPERATIONS.get(record.get('op'))
+    if operation is None:
+        raise ValueError(f"unknown op {record.get('op')!r}; expected one of "
+                         f"{', '.join(BATCH_OPERATIONS)}")
+    try:
+        return operation(cm, record)
+    except KeyError as e:
+        raise ValueError(f"{record['op']} needs {e.args[0]!r}")
+
+def batch_command(cm, args):
+    """Apply a JSONL file of operations in one transaction.
+
+    By default the first failing line rolls everything back. With
+    --keep-going each line runs in its own savepoint, so a failure only
+    undoes that line and the rest still commit together.
+    """
+    import bulk_io
+    results = []
+    failures = 0
+    with cm.transaction():
+        for line_number, record in bulk_io.read_records(args.file, 'jsonl'):
+            op = record.get('op') if isinstance(record, dict) else None
+            try:
+                if args.keep_going:
+                    with cm.savepoint():
+                        contact_id, result = run_batch_operation(cm, record)
+                else:
+                    contact_id, result = run_batch_operation(cm, record)
+            except (ValueError, LookupError, TypeError, sqlite3.Error) as e:
+                if not args.keep_going:
+                    raise ValueError(f"line {line_number}: {e}; nothing was applied")
+                print(f"Line {line_number}: {e}", file=sys.stderr)
+                failures += 1
+                results.append((line_number, op,
+                                record.get('id') if isinstance(record, dict) else None,
+                                f"error: {e}"))
+                continue
+            results.append((line_number, op, contact_id, result))
+    write_rows(results, BATCH_COLUMNS, args.format)
+    print(f"Applied {len(results) - failures} operations ({failures} failed)", file=sys.stderr)
+    return 1 if failures else 0
+
+def import_command(cm, args):
+    result = cm.import_file(args.file, args.format, args.chunk_size)
+    for row_number, message in result['errors']:
+        print(f"Row {row_number}: {message}", file=sys.stderr)
+    print(f"Imported {result['imported']} contacts "
+          f"({len(result['errors'])} rejected) in {result['elapsed']:.2f}s "
+          f"- {result['rows_per_sec']:.0f} rows/sec", file=sys.stderr)
+    return 1 if result['errors'] else 0
+
+def export_command(cm, args):
+    count = cm.export_file(args.file, args.format)
+    print(f"Exported {count} contacts", file=sys.stderr)
+    return 0
+
+def compact_command(cm, args):
+    import retention
+    conn = cm.pool.get()
+    if args.enable_incremental_vacuum and retention.enable_incremental_vacuum(conn):
+        print("Converted the database to incremental auto-vacuum", file=sys.stderr)
+    policy = retention.RetentionPolicy(
+        max_age_days=args.max_age_days,
+        max_per_contact=args.max_per_contact,
+        collapse_updates=args.collapse_updates,
+        drop_orphans=not args.keep_orphans)
+    result = cm.compact_history(policy, args.archive, args.batch_size, args.pause,
+                                vacuum=not args.no_vacuum)
+    removed = sum(result[reason] for reason in ('orphans', 'expired', 'collapsed', 'capped'))
+    print(f"Removed {removed} history rows in {result['batches']} batches "
+          f"({result['orphans']} orphaned, {result['expired']} expired, "
+          f"{result['collapsed']} collapsed, {result['capped']} over the cap) "
+          f"in {result['elapsed']:.2f}s", file=sys.stderr)
+    if args.archive:
+        print(f"Archived {result['archived']} rows to {args.archive}", file=sys.stderr)
+    if not args.no_vacuum:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            print(f"Released {result['pages_freed']} free pages", file=sys.stderr)
+        else:
+            print("Database does not use incremental auto-vacuum; free pages are reused "
+                  "but not released (see --enable-incremental-vacuum)", file=sys.stderr)
+    return 0
+
+def print_agenda(contacts):
+    print(f"{'due':<10}  {'id':>6}  {'name':<28} {'company':<24} {'status':<10}")
+    for contact in contacts:
+        print(f"{(contact.follow_up_date or '')[:10]:<10}  {contact.id:>6}  "
+              f"{(contact.name or '')[:28]:<28} {(contact.company or '')[:24]:<24} "
+              f"{contact.status or '':<10}")
+
+def agenda_command(cm, args):
+    if args.upcoming:
+        contacts = cm.next_due(args.limit, since=args.since, status=args.status)
+        if not contacts:
+            print("Nothing scheduled.")
+            return 0
+        print_agenda(contacts)
+        return 0
+
+    contacts = cm.get_agenda(args.until, args.limit, args.offset, status=args.status)
+    total = cm.count_due(args.until, status=args.status)
+    if not contacts:
+        print("Nothing due.")
+        return 0
+    print_agenda(contacts)
+    print(f"\n{args.offset + 1}-{args.offset + len(contacts)} of {total} due", file=sys.stderr)
+    return 0
+
+def snooze_command(cm, args):
+    changed = cm.snooze(args.ids, args.days)
+    print(f"Snoozed {changed} of {len(args.ids)} contacts by {args.days} days", file=sys.stderr)
+    return 0 if changed == len(args.ids) else 1
+
+def reschedule_command(cm, args):
+    changed = cm.reschedule(args.ids, None if args.clear else args.date)
+    print(f"Rescheduled {changed} of {len(args.ids)} contacts", file=sys.stderr)
+    return 0 if changed == len(args.ids) else 1
+
+def duplicates_command(cm, args):
+    pairs = cm.find_duplicates(args.threshold, args.limit)
+    if not pairs:
+        print("No likely duplicates.")
+        return 0
+    names = {contact.id: contact.name
+             for pair in pairs for contact in (cm.get_contact(pair.first_id),
+                                               cm.get_contact(pair.second_id))
+             if contact is not None}
+    print(f"{'score':>5}  {'ids':<15} {'reason':<6}  names")
+    for pair in pairs:
+        ids = f"{pair.first_id}, {pair.second_id}"
+        print(f"{pair.score:>5.2f}  {ids:<15} {pair.reason:<6}  "
+              f"{names.get(pair.first_id, '')} / {names.get(pair.second_id, '')}")
+    return 0
+
+def report_command(cm, args):
+    options = {'top': args.top} if args.name == 'companies' else {}
+    if args.name == 'stale':
+        options['days'] = args.days
+    if not args.snapshot:
+        result = cm.report(args.name, args.processes, **options)
+    else:
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            with cm.snapshot(os.path.join(tmp, "snapshot.db"), read_only=True) as copy:
+                result = copy.report(args.name, args.processes, **options)
+    write_rows(result.rows, result.columns, args.format)
+    print(f"{len(result.rows)} rows from {result.ranges} id ranges in {result.elapsed:.2f}s",
+          file=sys.stderr)
+    return 0
+
+def backup_command(cm, args):
+    cm.backup(args.file)
+    print(f"Backed up {args.db} to {args.file}", file=sys.stderr)
+    return 0
+
+def summary_command(cm, args):
+    if args.rebuild:
+        rows = cm.rebuild_summary()
+        print(f"Rebuilt the summary table ({rows} rows)", file=sys.stderr)
+    if args.check:
+        mismatches = cm.check_summary()
+        for dimension, value, stored, actual in mismatches:
+            print(f"{dimension} {value!r}: stored {stored}, actual {actual}")
+        print(f"{len(mismatches)} mismatched counts", file=sys.stderr)
+        return 1 if mismatches else 0
+
+    counts = cm.get_summary(top=args.top)
+    print(f"Contacts: {counts.total}")
+    print(f"Follow-ups: {counts.overdue} overdue, {counts.due_today} due today, "
+          f"{counts.upcoming} upcoming")
+    print("\nBy status:")
+    for status, count in sorted(counts.by_status.items(), key=lambda item: -item[1]):
+        print(f"  {status or '(none)':<24} {count:>8}")
+    print("\nBy relevance:")
+    for label, count in counts.by_relevance.items():
+        print(f"  {label:<24} {count:>8}")
+    print(f"\nTop {args.top} companies:")
+    for company, count in counts.top_companies:
+        print(f"  {company or '(none)':<24} {count:>8}")
+    return 0
+
+def sync_command(cm, args):
+    since = args.since
+    if since is None and args.state and os.path.exists(args.state):
+        with open(args.state) as handle:
+            since = int(handle.read().strip() or 0)
+    import json
+    count = 0
+    if args.full:
+        # Every contact as an insert, then continue from the snapshot's seq
+        with cm.sync_snapshot() as (last, contacts):
+            for contact in contacts:
+                sys.stdout.write(json.dumps({'seq': last, 'contact_id': contact['id'],
+                                             'op': 'insert', 'changed_at': None,
+                                             'before': None, 'after': contact}) + '\n')
+                count += 1
+    else:
+        last = since or 0
+        for change in cm.changes_since(last, limit=args.limit):
+            sys.stdout.write(json.dumps(change._asdict()) + '\n')
+            last = change.seq
+            count += 1
+    sys.stdout.flush()
+
+    if args.state:
+        # Only once the output is written, and atomically
+        temporary = f"{args.state}.tmp"
+        with open(temporary, 'w') as handle:
+            handle.write(f"{last}\n")
+        os.replace(temporary, args.state)
+    print(f"{count} {'contacts' if args.full else 'changes'}, now at seq {last}", file=sys.stderr)
+    return 0
+
+def trim_changes_command(cm, args):
+    deleted = cm.trim_changes(args.seq)
+    print(f"Trimmed {deleted} changes", file=sys.stderr)
+    return 0
+
+def stats_path(args):
+    return args.stats_file or f"{args.db}.stats.json"
+
+def stats_command(cm, args):
+    path = stats_path(args)
+    if not os.path.exists(path):
+        print(f"No query stats at {path}; run a command with --profile first", file=sys.stderr)
+        return 1
+    import json
+    with open(path) as handle:
+        snapshot = json.load(handle)
+    if args.json:
+        json.dump(snapshot, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f"Query stats from {snapshot['since']} to {snapshot['taken']}")
+    connections, commits = snapshot['connections'], snapshot['commits']
+    print(f"Connections opened: {connections['count']} ({connections['total_ms']:.2f} ms)")
+    print(f"Commits: {commits['count']} ({commits['total_ms']:.2f} ms total, "
+          f"{commits['max_ms']:.2f} ms max)")
+    print(f"\n{'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'rows':>9}  statement")
+    for query in snapshot['queries'][:args.top]:
+        print(f"{query['count']:>7} {query['total_ms']:>10.2f} {query['mean_ms']:>9.3f} "
+              f"{query['max_ms']:>9.3f} {query['rows']:>9}  {query['shape'][:100]}")
+        for step in query['plan'] or []:
+            print(f"{'':>49}plan: {step}")
+    if snapshot['slow_queries']:
+        print(f"\nSlow queries (>= {snapshot['slow_ms']} ms):")
+        for slow in snapshot['slow_queries']:
+            print(f"  {slow['at']} {slow['phase']:<7} {slow['ms']:8.1f} ms  {slow['shape'][:100]}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Contact Manager. Run without a command for the interactive menu.")
+    parser.add_argument('--db', default="contacts.db", help="database file (default: contacts.db)")
+    parser.add_argument('--profile', action='store_true',
+                        help="record query statistics for this run (see the stats command)")
+    parser.add_argument('--slow-ms', type=float, default=100.0,
+                        help="log statements slower than this with --profile (default: 100)")
+    parser.add_argument('--explain', action='store_true',
+                        help="capture EXPLAIN QUERY PLAN for each statement shape with --profile")
+    parser.add_argument('--stats-file', help="where --profile saves statistics (default: <db>.stats.json)")
+    parser.add_argument('--read-only', action='store_true',
+                        help="open the database read-only; commands that write fail")
+    subparsers = parser.add_subparsers(dest='command')
+
+    def output_options(subparser, columns=None):
+        subparser.add_argument('--format', choices=OUTPUT_FORMATS, default='table',
+                               help="output format (default: table)")
+        if columns:
+            subparser.add_argument('--columns', type=parse_columns, default=columns,
+                                   help=f"comma-separated columns (default: {','.join(columns)})")
+
+    def field_options(subparser, with_name):
+        if with_name:
+            subparser.add_argument('--name')
+        subparser.add_argument('--company')
+        subparser.add_argument('--role')
+        subparser.add_argument('--email')
+        subparser.add_argument('--linkedin-url', dest='linkedin_url')
+        subparser.add_argument('--relevance-score', dest='relevance_score', type=parse_score,
+                               metavar='1-10')
+        subparser.add_argument('--notes')
+        subparser.add_argument('--status')
+
+    add_parser = subparsers.add_parser('add', help="add a contact and print its id")
+    add_parser.add_argument('name')
+    field_options(add_parser, with_name=False)
+    output_options(add_parser)
+    add_parser.set_defaults(handler=add_command)
+
+    list_parser = subparsers.add_parser('list', help="stream contacts")
+    list_parser.add_argument('--search', help="only contacts matching this full-text search")
+    list_parser.add_argument('--status', help="only contacts with this status")
+    list_parser.add_argument('--min-score', type=int, help="only contacts with at least this relevance")
+    list_parser.add_argument('--order-by', choices=CONTACT_COLUMNS, default='relevance_score',
+                             help="sort column (default: relevance_score)")
+    list_parser.add_argument('--ascending', action='store_true', help="sort ascending")
+    list_parser.add_argument('--limit', type=int, help="rows to show (default: all)")
+    output_options(list_parser, LISTING_COLUMNS)
+    list_parser.set_defaults(handler=list_command)
+
+    search_parser = subparsers.add_parser('search', help="search contacts; exits 1 when nothing matches")
+    search_parser.add_argument('term')
+    search_parser.add_argument('--fuzzy', action='store_true',
+                               help="typo-tolerant name/company match, with a score column")
+    search_parser.add_argument('--threshold', type=float, default=0.3,
+                               help="minimum similarity with --fuzzy, 0-1 (default: 0.3)")
+    search_parser.add_argument('--limit', type=int, help="rows to show (default: all, 20 with --fuzzy)")
+    output_options(search_parser, SUMMARY_COLUMNS)
+    search_parser.set_defaults(handler=search_command)
+
+    update_parser = subparsers.add_parser('update', help="change fields of a contact")
+    update_parser.add_argument('id', type=int)
+    field_options(update_parser, with_name=True)
+    update_parser.set_defaults(handler=update_command)
+
+    bulk_update_parser = subparsers.add_parser(
+        'bulk-update', help="set the same fields on many contacts in one statement")
+    bulk_update_parser.add_argument('ids', type=int, nargs='+', help="contact ids")
+    field_options(bulk_update_parser, with_name=True)
+    bulk_update_parser.set_defaults(handler=bulk_update_command)
+
+    delete_parser = subparsers.add_parser('delete', help="delete contacts")
+    delete_parser.add_argument('ids', type=int, nargs='+', help="contact ids")
+    delete_parser.set_defaults(handler=delete_command)
+
+    history_parser = subparsers.add_parser('history', help="history of a contact, newest first")
+    history_parser.add_argument('id', type=int)
+    output_options(history_parser)
+    history_parser.set_defaults(handler=history_command)
+
+    batch_parser = subparsers.add_parser(
+        'batch', help="apply a JSONL file of operations in one transaction",
+        description="Each line is a JSON object with an \"op\" of "
+                    f"{', '.join(BATCH_OPERATIONS)}, e.g. "
+                    '{"op": "add", "name": "Ada", "company": "Acme"}, '
+                    '{"op": "update", "id": 7, "status": "Contacted"}, '
+                    '{"op": "bulk_update", "ids": [7, 8], "relevance_score": 9}, '
+                    '{"op": "delete", "id": 9}, '
+                    '{"op": "log", "id": 7, "action": "Call", "notes": "..."}, '
+                    '{"op": "snooze", "ids": [1, 2], "days": 3} or '
+                    '{"op": "reschedule", "ids": [1], "date": "2024-05-01"}.')
+    batch_parser.add_argument('file', help="JSONL file, or - for stdin")
+    batch_parser.add_argument('--keep-going', action='store_true',
+                              help="skip failing lines instead of rolling everything back")
+    output_options(batch_parser)
+    batch_parser.set_defaults(handler=batch_command)
+
+    import_parser = subparsers.add_parser('import', help="bulk import contacts from CSV, TSV or JSONL")
+    import_parser.add_argument('file', help="input file, or - for stdin")
+    import_parser.add_argument('--format', choices=FILE_FORMATS, help="defaults to the file extension")
+    import_parser.add_argument('--chunk-size', type=int, default=1000, help="rows per transaction (default: 1000)")
+    import_parser.set_defaults(handler=import_command)
+
+    export_parser = subparsers.add_parser('export', help="stream all contacts to CSV, TSV or JSONL")
+    export_parser.add_argument('file', help="output file, or - for stdout")
+    export_parser.add_argument('--format', choices=FILE_FORMATS, help="defaults to the file extension")
+    export_parser.set_defaults(handler=export_command)
+
+    agenda_parser = subparsers.add_parser('agenda', help="contacts due for a follow-up")
+    agenda_parser.add_argument('--until', metavar='DATE', help="include follow-ups due by this date (default: today)")
+    agenda_parser.add_argument('--upcoming', action='store_true',
+                               help="list the next scheduled follow-ups instead of what is due")
+    agenda_parser.add_argument('--since', metavar='DATE', help="with --upcoming, start from this date (default: today)")
+    agenda_parser.add_argument('--status', help="only contacts with this status")
+    agenda_parser.add_argument('--limit', type=int, default=20, help="rows to show (default: 20)")
+    agenda_parser.add_argument('--offset', type=int, default=0, help="rows to skip")
+    agenda_parser.set_defaults(handler=agenda_command)
+
+    snooze_parser = subparsers.add_parser('snooze', help="push follow-ups a number of days past today")
+    snooze_parser.add_argument('ids', type=int, nargs='+', help="contact ids")
+    snooze_parser.add_argument('--days', type=int, default=1, help="days from today (default: 1)")
+    snooze_parser.set_defaults(handler=snooze_command)
+
+    reschedule_parser = subparsers.add_parser('reschedule', help="set the follow-up date of contacts")
+    reschedule_parser.add_argument('ids', type=int, nargs='+', help="contact ids")
+    when = reschedule_parser.add_mutually_exclusive_group(required=True)
+    when.add_argument('--date', help="new follow-up date (YYYY-MM-DD)")
+    when.add_argument('--clear', action='store_true', help="remove the follow-up")
+    reschedule_parser.set_defaults(handler=reschedule_command)
+
+    compact_parser = subparsers.add_parser('compact', help="apply a retention policy to contact history")
+    compact_parser.add_argument('--max-age-days', type=int, help="drop history older than this")
+    compact_parser.add_argument('--max-per-contact', type=int, help="keep only the newest N rows per contact")
+    compact_parser.add_argument('--collapse-updates', action='store_true',
+                                help="merge runs of consecutive Updated rows into one")
+    compact_parser.add_argument('--keep-orphans', action='store_true',
+                                help="keep history of contacts that were deleted")
+    compact_parser.add_argument('--archive', metavar='FILE',
+                                help="copy dropped rows into this SQLite file first")
+    compact_parser.add_argument('--batch-size', type=int, default=200,
+                                help="contacts per transaction (default: 200)")
+    compact_parser.add_argument('--pause', type=float, default=0.0,
+                                help="seconds to sleep between batches (default: 0)")
+    compact_parser.add_argument('--no-vacuum', action='store_true',
+                                help="skip the incremental VACUUM afterwards")
+    compact_parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                                help="one-off full VACUUM to switch an older database to incremental auto-vacuum")
+    compact_parser.set_defaults(handler=compact_command)
+
+    duplicates_parser = subparsers.add_parser('duplicates', help="list likely duplicate contacts")
+    duplicates_parser.add_argument('--threshold', type=float, default=0.85,
+                                   help="minimum name/company similarity, 0-1 (default: 0.85)")
+    duplicates_parser.add_argument('--limit', type=int, help="pairs to show (default: all)")
+    duplicates_parser.set_defaults(handler=duplicates_command)
+
+    stats_parser = subparsers.add_parser('stats', help="print query statistics saved by --profile")
+    stats_parser.add_argument('--json', action='store_true', help="print the raw JSON snapshot")
+    stats_parser.add_argument('--top', type=int, default=20, help="statements to show (default: 20)")
+    stats_parser.set_defaults(handler=stats_command)
+
+    summary_parser = subparsers.add_parser('summary', help="dashboard counts from the summary table")
+    summary_parser.add_argument('--top', type=int, default=10, help="companies to show (default: 10)")
+    summary_parser.add_argument('--rebuild', action='store_true',
+                                help="recount the summary table from contacts first")
+    summary_parser.add_argument('--check', action='store_true',
+                                help="compare the stored counts with a recount; exits 1 on drift")
+    summary_parser.set_defaults(handler=summary_command)
+
+    sync_parser = subparsers.add_parser(
+        'sync', help="print changes since a sequence number as JSONL")
+    sync_parser.add_argument('--since', type=int, metavar='SEQ',
+                             help="last sequence number already applied (default: from --state, else 0)")
+    sync_parser.add_argument('--state', metavar='FILE',
+                             help="file holding the last sequence number; updated after printing")
+    sync_parser.add_argument('--full', action='store_true',
+                             help="print every contact as an insert, to start a new mirror")
+    sync_parser.add_argument('--limit', type=int, help="changes to print at most (default: all)")
+    sync_parser.set_defaults(handler=sync_command)
+
+    trim_parser = subparsers.add_parser(
+        'trim-changes', help="drop change log entries every mirror has applied")
+    trim_parser.add_argument('seq', type=int, help="last sequence number to drop")
+    trim_parser.set_defaults(handler=trim_changes_command)
+
+    report_parser = subparsers.add_parser(
+        'report', help="aggregate report, computed by read-only worker processes")
+    # Checked by ContactManager.report, which imports the reports module
+    report_parser.add_argument('name', help="companies, relevance or stale")
+    report_parser.add_argument('--processes', type=int,
+                               help="worker processes (default: one per CPU)")
+    report_parser.add_argument('--top', type=int, help="companies: rows to show (default: all)")
+    report_parser.add_argument('--days', type=int, default=90,
+                               help="stale: days without contact (default: 90)")
+    report_parser.add_argument('--snapshot', action='store_true',
+                               help="report on a point-in-time copy of the database")
+    output_options(report_parser)
+    report_parser.set_defaults(handler=report_command)
+
+    backup_parser = subparsers.add_parser(
+        'backup', help="copy the database to a file while it stays in use")
+    backup_parser.add_argument('file')
+    backup_parser.set_defaults(handler=backup_command)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cm = ContactManager(args.db, instrument=args.profile, slow_ms=args.slow_ms,
+                        explain=args.explain,
+                        stats_path=stats_path(args) if args.profile else None,
+                        read_only=args.read_only)
+
+    if args.command:
+        try:
+            return args.handler(cm, args)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        except LookupError as e:
+            print(f"Error: {e.args[0]}", file=sys.stderr)
+            return 1
+        except sqlite3.Error as e:
+            # Constraint violations, a locked or read-only database, ...
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        except BrokenPipeError:
+            # Output was piped into something like head that stopped
+            # reading; don't let the interpreter complain when it flushes
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        finally:
+            cm.close()
+
     while True:
         print_menu()
         choice = input("\nEnter your choice (1-6): ")
@@ -43,39 +729,46 @@ def main():
             print("Contact added successfully!")
 
         elif choice == "2":
-            # List all contacts
-            contacts = cm.get_all_contacts()
-            if not contacts:
-                print("No contacts found.")
-                continue
-                
-            print("\nAll Contacts:")
-            for contact in contacts:
-                print(f"\nID: {contact[0]}")
-                print(f"Name: {contact[1]}")
-                print(f"Company: {contact[2]}")
-                print(f"Role: {contact[3]}")
-                print(f"Email: {contact[4]}")
-                print(f"LinkedIn: {contact[5]}")
-                print(f"Relevance: {contact[6]}")
-                print(f"Notes: {contact[7]}")
+            # List all contacts, streamed a page at a time
+            count = 0
+            for contact in cm.stream_contacts(columns=LISTING_COLUMNS):
+                if count == 0:
+                    print("\nAll Contacts:")
+                count += 1
+                contact_id, name, company, role, email, linkedin, relevance, notes = contact
+                print(f"\nID: {contact_id}")
+                print(f"Name: {name}")
+                print(f"Company: {company}")
+                print(f"Role: {role}")
+                print(f"Email: {email}")
+                print(f"LinkedIn: {linkedin}")
+                print(f"Relevance: {relevance}")
+                print(f"Notes: {notes}")
                 print("-" * 40)
+            if count == 0:
+                print("No contacts found.")
 
         elif choice == "3":
             # Search contacts
             search_term = input("Enter search term: ")
-            contacts = cm.search_contacts(search_term)
+            contacts = cm.search_contacts(search_term, columns=SUMMARY_COLUMNS)
             
             if not contacts:
-                print("No matching contacts found.")
+                suggestions = cm.fuzzy_search(search_term, limit=5, columns=SUMMARY_COLUMNS)
+                if not suggestions:
+                    print("No matching contacts found.")
+                    continue
+                print("No exact matches. Did you mean:")
+                for contact, score in suggestions:
+                    print(f"  {contact.id}: {contact.name} ({contact.company})")
                 continue
                 
             print("\nMatching Contacts:")
             for contact in contacts:
-                print(f"\nID: {contact[0]}")
-                print(f"Name: {contact[1]}")
-                print(f"Company: {contact[2]}")
-                print(f"Relevance: {contact[6]}")
+                print(f"\nID: {contact.id}")
+                print(f"Name: {contact.name}")
+                print(f"Company: {contact.company}")
+                print(f"Relevance: {contact.relevance_score}")
                 print("-" * 40)
 
         elif choice == "4":
@@ -106,21 +799,30 @@ def main():
             if notes: updates['notes'] = notes
             
             if updates:
-                cm.update_contact(contact_id, **updates)
-                print("Contact updated successfully!")
+                try:
+                    changed = cm.update_contact(contact_id, **updates)
+                except LookupError as e:
+                    print(e.args[0])
+                else:
+                    print("Contact updated successfully!" if changed else "No changes")
 
         elif choice == "5":
             # Delete contact
             contact_id = input("Enter contact ID to delete: ")
-            cm.delete_contact(contact_id)
-            print("Contact deleted successfully!")
+            try:
+                cm.delete_contact(contact_id)
+            except LookupError as e:
+                print(e.args[0])
+            else:
+                print("Contact deleted successfully!")
 
         elif choice == "6":
             print("Goodbye!")
+            cm.close()
             sys.exit(0)
 
         else:
             print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
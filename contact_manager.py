@@ -1,151 +1,1161 @@
 import sqlite3
-from datetime import datetime
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import islice
 import os
+import sys
+import threading
+import time
+
+from cache import LRUCache
+from contact_record import CONTACT_COLUMNS, SUMMARY_COLUMNS, Contact
+from database import ConnectionPool
+import change_log
+import migrations
+import search_index
+import summary
+
+# bulk_io, fuzzy_index, history_writer, instrumentation and retention are
+# imported by the methods that need them, so opening a ContactManager
+# doesn't pay for csv, json, logging and friends up front.
+
+FILTER_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE', 'IS', 'IS NOT')
+
+# One page of contacts plus the key to pass as `after` for the next page,
+# or None when this is the last page.
+Page = namedtuple('Page', ['rows', 'next_cursor'])
+
+# Delivered to subscribers after a commit: kind is 'inserted', 'updated'
+# or 'deleted' and ids is a tuple of the affected contact ids.
+ChangeEvent = namedtuple('ChangeEvent', ['kind', 'ids'])
+
+# Columns accepted by bulk import, in INSERT order
+IMPORT_FIELDS = ('name', 'company', 'role', 'email', 'linkedin_url',
+                 'relevance_score', 'notes', 'status',
+                 'last_contact_date', 'follow_up_date')
+
+EXPORT_COLUMNS = ('id',) + IMPORT_FIELDS + ('created_at',)
+
+# Columns update_contact and bulk_update may set; id and created_at are
+# fixed once the row exists
+UPDATABLE_COLUMNS = tuple(column for column in CONTACT_COLUMNS
+                          if column not in ('id', 'created_at'))
+
+# Default columns returned by the follow-up agenda queries
+AGENDA_COLUMNS = ('id', 'name', 'company', 'follow_up_date',
+                  'last_contact_date', 'status', 'relevance_score')
+
+
+def validate_import_record(record):
+    """Normalize an import record into an INSERT tuple, or raise ValueError"""
+    name = str(record.get('name') or '').strip()
+    if not name:
+        raise ValueError("name is required")
+
+    score = record.get('relevance_score')
+    if score in (None, ''):
+        score = 1
+    try:
+        score = int(score)
+    except (TypeError, ValueError):
+        raise ValueError(f"relevance_score {score!r} is not a number")
+    if not 1 <= score <= 10:
+        raise ValueError(f"relevance_score {score} is not between 1 and 10")
+
+    return (name,
+            record.get('company') or '',
+            record.get('role') or '',
+            record.get('email') or '',
+            record.get('linkedin_url') or '',
+            score,
+            record.get('notes') or '',
+            record.get('status') or 'New',
+            record.get('last_contact_date') or None,
+            record.get('follow_up_date') or None)
+
+def validate_update_fields(fields):
+    """Check update keyword arguments against UPDATABLE_COLUMNS and return
+    them in table order, so the same set of columns always produces the
+    same SQL text (and reuses sqlite3's prepared statement)"""
+    unknown = set(fields) - set(UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Can't update contact column(s) {', '.join(sorted(unknown))}")
+    score = fields.get('relevance_score')
+    if isinstance(score, str):
+        # Form and CLI input; stored as an integer, so compare it as one
+        try:
+            fields = dict(fields, relevance_score=int(score))
+        except ValueError:
+            raise ValueError(f"relevance_score {score!r} is not a number")
+    return {column: fields[column] for column in UPDATABLE_COLUMNS if column in fields}
+
+def _day(value):
+    """Accept a date, datetime or ISO string and return 'YYYY-MM-DD'"""
+    if value is None:
+        return date.today().isoformat()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; expected YYYY-MM-DD")
+
+def _next_day(value):
+    return (date.fromisoformat(_day(value)) + timedelta(days=1)).isoformat()
+
+def _cache_key(contact_id):
+    """Callers pass ids as ints (GUI) or strings (CLI input); cache by int"""
+    try:
+        return int(contact_id)
+    except (TypeError, ValueError):
+        return contact_id
 
 class ContactManager:
-    def __init__(self, db_path="contacts.db"):
+    def __init__(self, db_path="contacts.db", cache_size=1024, instrument=False,
+                 slow_ms=100.0, explain=False, stats_path=None,
+                 history_batch_size=None, history_flush_interval=1.0,
+                 read_only=False):
         self.db_path = db_path
+        # A read-only manager never takes a write lock, so reporting and
+        # browsing can't hold up writers; every write method raises
+        # sqlite3.OperationalError instead
+        self.read_only = read_only
+        self.pool = ConnectionPool(db_path, read_only=read_only)
+        self.stats_path = stats_path
+        if instrument:
+            self.enable_instrumentation(slow_ms, explain)
+        self.contact_cache = LRUCache(cache_size)
+        self.history_cache = LRUCache(cache_size)
+        self._seen_writes = threading.local()
+        self._processed_lock = threading.Lock()
+        self._local = threading.local()
+        self._listeners = []
+        self._fuzzy = None
+        self._fuzzy_lock = threading.Lock()
         self.setup_database()
+        # The caches start empty, so they are current as of now
+        self._processed_writes = self._write_marks(self.pool.get())
+        # Write-behind history logging is opt-in; see log_history
+        self.history_writer = None
+        if history_batch_size and not read_only:
+            from history_writer import HistoryWriter
+            self.history_writer = HistoryWriter(self.pool, history_batch_size,
+                                                history_flush_interval,
+                                                on_flush=self._history_flushed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Flush buffered history and close all pooled database connections"""
+        if self.history_writer is not None:
+            self.history_writer.close()
+        if self.pool.stats is not None and self.stats_path:
+            with open(self.stats_path, 'w') as handle:
+                handle.write(self.pool.stats.to_json(indent=2))
+        self.pool.close()
+
+    def enable_instrumentation(self, slow_ms=100.0, explain=False):
+        """Start profiling every database call; see instrumentation.QueryStats.
+        Costs a proxy object per call, so it is off unless asked for."""
+        from instrumentation import QueryStats
+        self.pool.stats = QueryStats(slow_ms=slow_ms, explain=explain)
+        return self.pool.stats
+
+    def disable_instrumentation(self):
+        self.pool.stats = None
+
+    def query_stats(self):
+        """Snapshot of the instrumentation counters, or None when disabled"""
+        if self.pool.stats is None:
+            return None
+        return self.pool.stats.snapshot()
+
+    def cache_stats(self):
+        """Hit/miss counters for the contact and history caches"""
+        return {
+            'contacts': self.contact_cache.stats(),
+            'history': self.history_cache.stats(),
+        }
+
+    def _invalidate(self, contact_id, caches=None):
+        """Drop a contact's cached record and history (or just `caches`).
+
+        Inside a transaction this waits until it has ended: dropping them
+        before the commit would let another thread cache the old values
+        again in between. Until then this thread reads them uncached.
+        """
+        key = _cache_key(contact_id)
+        stale = getattr(self._local, 'stale', None)
+        for cache in caches or (self.contact_cache, self.history_cache):
+            if stale is not None:
+                stale.add((cache, key))
+            else:
+                cache.invalidate(key)
+
+    def _cached(self, cache, key):
+        stale = getattr(self._local, 'stale', None)
+        if stale is not None and (cache, key) in stale:
+            return None
+        return cache.get(key)
+
+    def _write_marks(self, conn):
+        """(newest change log seq, newest history id) as `conn` sees them"""
+        history_id = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM contact_history").fetchone()[0]
+        return change_log.last_seq(conn), history_id
+
+    def _check_external_writes(self, conn):
+        """Invalidate what other connections changed since the caches were
+        last brought up to date.
+
+        Writes made through this manager invalidate as they commit, but
+        other threads and processes don't tell us what they changed, so
+        PRAGMA data_version says whether anything did and the change log
+        and the new history rows say which contacts to drop. data_version
+        is per connection, so each thread keeps its own; how far the
+        shared caches have been invalidated is kept once for the manager,
+        so a thread's first read catches up from there too.
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = getattr(self._seen_writes, 'value', None)
+        if seen is not None and seen[0] == version:
+            return
+        with self._processed_lock:
+            marks = self._write_marks(conn)
+            if seen is not None and marks == seen[1]:
+                # Neither contacts nor new history, e.g. history compacted
+                # by another process: nothing says which contacts it touched
+                self.history_cache.clear()
+            elif any(mark > processed for mark, processed in zip(marks, self._processed_writes)):
+                # Not already handled by another thread
+                self._invalidate_written(conn, self._processed_writes, marks)
+            self._processed_writes = tuple(map(max, self._processed_writes, marks))
+        self._seen_writes.value = (version, marks)
+
+    def _invalidate_written(self, conn, processed, marks):
+        (seen_seq, seen_history_id), (seq, history_id) = processed, marks
+        if change_log.oldest_seq(conn) > seen_seq + 1:
+            # Trimmed before we read it
+            self.contact_cache.clear()
+            self.history_cache.clear()
+            return
+        for (contact_id,) in conn.execute(
+                "SELECT DISTINCT contact_id FROM contact_changes WHERE seq > ? AND seq <= ?",
+                (seen_seq, seq)):
+            self.contact_cache.invalidate(contact_id)
+            self.history_cache.invalidate(contact_id)
+        for (contact_id,) in conn.execute(
+                "SELECT DISTINCT contact_id FROM contact_history WHERE id > ? AND id <= ?",
+                (seen_history_id, history_id)):
+            self.history_cache.invalidate(contact_id)
+
+    def subscribe(self, listener):
+        """Call listener(events) with a list of ChangeEvents after every
+        commit that inserts, updates or deletes contacts. Listeners run on
+        the thread that committed."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _record_change(self, kind, *contact_ids):
+        self._local.changes.append((kind, contact_ids))
+
+    def _emit_changes(self, changes):
+        """Coalesce consecutive changes of the same kind and notify"""
+        events = []
+        for kind, ids in changes:
+            if events and events[-1].kind == kind:
+                events[-1] = ChangeEvent(kind, events[-1].ids + ids)
+            else:
+                events.append(ChangeEvent(kind, ids))
+        for listener in list(self._listeners):
+            listener(events)
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one atomic commit.
+
+        Every mutating method runs inside this context manager, so calling
+        them within a caller-supplied ``with cm.transaction():`` block makes
+        the whole batch, history rows included, commit or roll back together.
+        Change events are only delivered once the outermost block commits.
+        """
+        outermost = not self.pool.in_transaction()
+        if outermost:
+            self._local.changes = []
+            self._local.history = []
+            self._local.stale = set()
+        try:
+            with self.pool.transaction() as conn:
+                yield conn
+        finally:
+            if outermost:
+                changes, self._local.changes = self._local.changes, []
+                history, self._local.history = self._local.history, []
+                stale, self._local.stale = self._local.stale, None
+                for cache, key in stale:
+                    cache.invalidate(key)
+        if outermost and history:
+            self.history_writer.add(history)
+        if outermost and changes:
+            self._emit_changes(changes)
+
+    @contextmanager
+    def savepoint(self, name="sp"):
+        """Make the enclosed writes undoable on their own inside an open
+        transaction: if an exception escapes, only they are rolled back
+        (along with their pending change events) and the error propagates."""
+        if not self.pool.in_transaction():
+            raise sqlite3.ProgrammingError("savepoint() needs an open transaction")
+        conn = self.pool.get()
+        recorded = len(self._local.changes)
+        logged = len(self._local.history)
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            del self._local.changes[recorded:]
+            del self._local.history[logged:]
+            raise
+        else:
+            conn.execute(f"RELEASE {name}")
 
     def setup_database(self):
-        """Create the database and contacts table if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contacts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                company TEXT,
-                role TEXT,
-                email TEXT,
-                linkedin_url TEXT,
-                relevance_score INTEGER CHECK (relevance_score BETWEEN 1 AND 10),
-                notes TEXT,
-                last_contact_date TEXT,
-                follow_up_date TEXT,
-                status TEXT DEFAULT 'New',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS contact_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                contact_id INTEGER,
-                action_type TEXT,
-                action_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                FOREIGN KEY (contact_id) REFERENCES contacts (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Create or upgrade the schema to the current version.
+
+        An up-to-date database (the usual case) costs one read of
+        user_version and sqlite_master and no write lock; migrations and
+        the FTS backfill only run in a write transaction when something
+        is missing.
+        """
+        version, has_fts = self.pool.get().execute('''
+            SELECT (SELECT user_version FROM pragma_user_version),
+                   EXISTS (SELECT 1 FROM sqlite_master
+                           WHERE type = 'table' AND name = 'contacts_fts')
+        ''').fetchone()
+        if version >= migrations.SCHEMA_VERSION and has_fts:
+            self.schema_version = version
+            self.fts_enabled = True
+            return
+        if self.read_only:
+            if version < migrations.SCHEMA_VERSION:
+                raise sqlite3.OperationalError(
+                    f"{self.db_path} is at schema version {version}, not "
+                    f"{migrations.SCHEMA_VERSION}; open it read-write once to upgrade it")
+            # Without FTS5 search falls back to LIKE, as it does read-write
+            self.schema_version = version
+            self.fts_enabled = False
+            return
+
+        with self.transaction() as conn:
+            self.schema_version = migrations.migrate(conn)
+            
+            # The FTS5 index depends on how SQLite was built, so it is kept
+            # out of the versioned migrations: it is created and backfilled
+            # whenever it is missing and the extension is available, and
+            # search falls back to LIKE otherwise.
+            cursor = conn.cursor()
+            self.fts_enabled = search_index.fts5_available(conn)
+            if self.fts_enabled and not search_index.fts_index_exists(cursor):
+                search_index.create_fts_index(cursor)
 
     def add_contact(self, name, company, role, email="", linkedin_url="", 
                    relevance_score=1, notes="", status="New"):
         """Add a new contact to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO contacts (name, company, role, email, linkedin_url, 
-                                relevance_score, notes, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (name, company, role, email, linkedin_url, relevance_score, 
-              notes, status))
-        
-        contact_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        self.log_history(contact_id, "Created", "Initial contact created")
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO contacts (name, company, role, email, linkedin_url, 
+                                    relevance_score, notes, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (name, company, role, email, linkedin_url, relevance_score, 
+                  notes, status))
+            
+            contact_id = cursor.lastrowid
+            self.log_history(contact_id, "Created", "Initial contact created")
+            self._record_change('inserted', contact_id)
+        self._invalidate(contact_id)
         return contact_id
 
     def update_contact(self, contact_id, **kwargs):
-        """Update an existing contact's information"""
-        conn = sqlite3.connect(self.db_path)
+        """Set columns of an existing contact and return the names of the
+        ones whose value actually changed.
+
+        Only UPDATABLE_COLUMNS are accepted (ValueError otherwise). The
+        current values are read under the write lock and only the columns
+        that differ are written, so saving an unchanged form costs one
+        primary-key read: no write, no history entry, no change event.
+        Raises LookupError if there is no such contact.
+        """
+        fields = validate_update_fields(kwargs)
+        if not fields:
+            return ()
+        key = _cache_key(contact_id)
+        with self.transaction() as conn:
+            current = conn.execute(
+                f"SELECT {', '.join(fields)} FROM contacts WHERE id = ?", (key,)).fetchone()
+            if current is None:
+                raise LookupError(f"No contact with id {contact_id}")
+            changed = {column: value for (column, value), old in zip(fields.items(), current)
+                       if value != old or type(value) is not type(old)}
+            if not changed:
+                return ()
+            assignments = ', '.join(f"{column} = ?" for column in changed)
+            conn.execute(f"UPDATE contacts SET {assignments} WHERE id = ?",
+                         [*changed.values(), key])
+            self._invalidate(key)
+            self._record_change('updated', key)
+            self.log_history(key, "Updated", f"Updated fields: {', '.join(changed)}")
+        return tuple(changed)
+
+    def bulk_update(self, contact_ids, **fields):
+        """Set the same columns on many contacts, e.g. to re-score them, and
+        return the ids that changed.
+
+        Runs as a single UPDATE over the ids (passed as one JSON array, so
+        there is no limit on how many) in one transaction. Contacts that
+        already have every value are skipped, as in update_contact; each
+        changed contact gets one history entry naming the fields set.
+        """
+        fields = validate_update_fields(fields)
+        keys = [int(contact_id) for contact_id in contact_ids]
+        if not fields or not keys:
+            return []
+        assignments = ', '.join(f"{column} = :{column}" for column in fields)
+        differs = ' OR '.join(f"{column} IS NOT :{column}" for column in fields)
+        params = dict(fields, ids=f"[{','.join(map(str, keys))}]")
+        with self.transaction() as conn:
+            changed = [row[0] for row in conn.execute(f'''
+                UPDATE contacts SET {assignments}
+                WHERE id IN (SELECT value FROM json_each(:ids)) AND ({differs})
+                RETURNING id
+            ''', params).fetchall()]
+            if changed:
+                for key in changed:
+                    self._invalidate(key)
+                self._record_change('updated', *changed)
+                self._log_history_many(changed, "Updated",
+                                       f"Updated fields: {', '.join(fields)}")
+        return changed
+
+    def get_contact(self, contact_id):
+        """Look up a single contact by primary key as a Contact record, or
+        None if it doesn't exist.
+
+        Results are served from an LRU cache. Entries are evicted once the
+        write methods commit, and nothing read inside an open transaction
+        is cached, so a rollback can't leave uncommitted values behind. A
+        row read while another thread's write was committing isn't cached
+        either (see LRUCache).
+        """
+        key = _cache_key(contact_id)
+        conn = self.pool.get()
+        self._check_external_writes(conn)
+        contact = self._cached(self.contact_cache, key)
+        if contact is not None:
+            return contact
+
+        generation = self.contact_cache.generation
+        row = conn.execute("SELECT * FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+        if row is None:
+            return None
+        contact = Contact(row)
+        if not self.pool.in_transaction():
+            self.contact_cache.put(key, contact, generation)
+        return contact
+
+    def _records(self, rows, columns):
+        """Wrap rows selected as `columns` in Contact records that fetch
+        any other column on first access"""
+        loader = None if columns == CONTACT_COLUMNS else self._load_missing
+        return [Contact(row, columns, loader) for row in rows]
+
+    def _load_missing(self, contact):
+        columns = contact.missing_columns()
+        row = self.pool.get().execute(
+            f"SELECT {', '.join(columns)} FROM contacts WHERE id = ?", (contact.id,)).fetchone()
+        contact.fill(columns, row or (None,) * len(columns))
+
+    def get_all_contacts(self, columns=None):
+        """Retrieve all contacts as Contact records, selecting only
+        `columns` (all of them by default)"""
+        columns = self._record_projection(columns)
+        conn = self.pool.get()
         cursor = conn.cursor()
         
-        update_fields = []
-        values = []
-        for key, value in kwargs.items():
-            update_fields.append(f"{key} = ?")
-            values.append(value)
-        
-        values.append(contact_id)
-        query = f"UPDATE contacts SET {', '.join(update_fields)} WHERE id = ?"
-        
-        cursor.execute(query, values)
-        conn.commit()
-        conn.close()
+        cursor.execute(f"SELECT {', '.join(columns)} FROM contacts ORDER BY relevance_score DESC")
+        contacts = cursor.fetchall()
         
-        self.log_history(contact_id, "Updated", f"Updated fields: {', '.join(kwargs.keys())}")
+        return self._records(contacts, columns)
+
+    def _projection(self, columns):
+        if columns is None:
+            return CONTACT_COLUMNS
+        for column in columns:
+            if column not in CONTACT_COLUMNS:
+                raise ValueError(f"Unknown contact column {column!r}")
+        return tuple(columns)
+
+    def _record_projection(self, columns, default=CONTACT_COLUMNS):
+        """_projection for queries that return Contact records, which always
+        select id: a record loads its other columns by it"""
+        columns = self._projection(columns or default)
+        return columns if 'id' in columns else ('id',) + columns
+
+    def _filter_clauses(self, filters, search):
+        """Translate filters/search into WHERE clauses and parameters.
+
+        filters maps a column to a value (equality) or an (operator, value)
+        pair, e.g. {'status': 'New', 'relevance_score': ('>=', 7)}.
+        """
+        clauses = []
+        params = []
+        for column, condition in (filters or {}).items():
+            if column not in CONTACT_COLUMNS:
+                raise ValueError(f"Unknown contact column {column!r}")
+            op, value = condition if isinstance(condition, tuple) else ('=', condition)
+            op = op.upper()
+            if value is None and op in ('=', '!='):
+                op = 'IS' if op == '=' else 'IS NOT'
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator {op!r}")
+            clauses.append(f"{column} {op} ?")
+            params.append(value)
+
+        if search:
+            match_query = search_index.build_match_query(search)
+            if self.fts_enabled and match_query:
+                clauses.append("id IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)")
+                params.append(match_query)
+            else:
+                clauses.append("(name LIKE ? OR company LIKE ? OR notes LIKE ?)")
+                params.extend([f'%{search}%'] * 3)
+        return clauses, params
+
+    def get_contacts_page(self, page_size=50, after=None, columns=None,
+                          filters=None, search=None, order_by='relevance_score',
+                          descending=True):
+        """Fetch one page of contacts ordered by `order_by`, then id.
 
-    def get_all_contacts(self):
-        """Retrieve all contacts from the database"""
-        conn = sqlite3.connect(self.db_path)
+        Pages are addressed by keyset rather than OFFSET: pass the previous
+        page's next_cursor as `after` and the query seeks straight to it
+        through the sort column's index, so every page costs the same no
+        matter how deep it is. `columns` limits the selected columns and
+        `filters`/`search` narrow the rows (see _filter_clauses).
+
+        Unlike the other queries, rows are plain tuples in `columns` order,
+        not Contact records: pages feed the list views and file writers,
+        which consume them positionally, and a tuple of just the selected
+        columns is the smallest a row can be.
+        """
+        columns = self._projection(columns)
+        if order_by not in CONTACT_COLUMNS:
+            raise ValueError(f"Unknown contact column {order_by!r}")
+        clauses, params = self._filter_clauses(filters, search)
+        select = f"SELECT {', '.join(columns)}, {order_by}, id FROM contacts"
+        direction = "DESC" if descending else "ASC"
+        limit = page_size + 1
+
+        # A (column DESC, id ASC) key can't be expressed as one row-value
+        # comparison, so the remainder after the cursor is read as up to
+        # three index ranges: the rest of the cursor's value, the values
+        # beyond it, then NULLs (which SQLite sorts lowest).
+        if after is None:
+            segments = [(None, [], f"{order_by} {direction}, id")]
+        else:
+            value, last_id = after
+            if value is None:
+                segments = [(f"{order_by} IS NULL AND id > ?", [last_id], "id")]
+                if not descending:
+                    segments.append((f"{order_by} IS NOT NULL", [], f"{order_by}, id"))
+            else:
+                beyond = "<" if descending else ">"
+                segments = [
+                    (f"{order_by} = ? AND id > ?", [value, last_id], "id"),
+                    (f"{order_by} {beyond} ?", [value], f"{order_by} {direction}, id"),
+                ]
+                if descending:
+                    segments.append((f"{order_by} IS NULL", [], "id"))
+
+        conn = self.pool.get()
+        rows = []
+        for condition, segment_params, order in segments:
+            where = clauses + [condition] if condition else clauses
+            query = select
+            if where:
+                query += " WHERE " + " AND ".join(f"({clause})" for clause in where)
+            query += f" ORDER BY {order} LIMIT ?"
+            rows.extend(conn.execute(query, params + segment_params + [limit - len(rows)]))
+            if len(rows) >= limit:
+                break
+
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = tuple(rows[page_size - 1][-2:])
+        return Page([row[:-2] for row in rows[:page_size]], next_cursor)
+
+    def stream_contacts(self, page_size=500, columns=None, filters=None, search=None,
+                        order_by='relevance_score', descending=True):
+        """Lazily yield contacts in sorted order, one keyset page at a time.
+
+        Only one page is held in memory, and no read transaction stays open
+        between pages, so writers are never blocked by a slow consumer.
+        Yields the same tuples as get_contacts_page.
+        """
+        after = None
+        while True:
+            page = self.get_contacts_page(page_size, after, columns, filters, search,
+                                          order_by, descending)
+            yield from page.rows
+            if page.next_cursor is None:
+                break
+            after = page.next_cursor
+
+    def count_contacts(self, filters=None, search=None):
+        """Number of contacts matching the same filters as get_contacts_page"""
+        clauses, params = self._filter_clauses(filters, search)
+        query = "SELECT COUNT(*) FROM contacts"
+        if clauses:
+            query += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+        return self.pool.get().execute(query, params).fetchone()[0]
+
+    def search_contacts(self, search_term, columns=None, limit=None):
+        """Search contacts by name, company, role, email, or notes.
+
+        Every word is prefix-matched against the FTS5 index and results are
+        ranked by bm25 weighted up by relevance_score. Returns Contact
+        records holding `columns` (all of them by default); pass
+        SUMMARY_COLUMNS for a result list that doesn't need the notes.
+        With a limit, only the best `limit` matches are read.
+        """
+        columns = self._record_projection(columns)
+        match_query = search_index.build_match_query(search_term)
+        if not self.fts_enabled or match_query is None:
+            return self._search_contacts_like(search_term, columns, limit)
+
+        conn = self.pool.get()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT * FROM contacts ORDER BY relevance_score DESC")
-        contacts = cursor.fetchall()
+        cursor.execute(f'''
+            SELECT {', '.join(f"contacts.{column}" for column in columns)} FROM contacts_fts
+            JOIN contacts ON contacts.id = contacts_fts.rowid
+            WHERE contacts_fts MATCH ?
+            ORDER BY bm25(contacts_fts, {search_index.BM25_WEIGHTS})
+                     * (1 + COALESCE(contacts.relevance_score, 1) / 10.0)
+            LIMIT ?
+        ''', (match_query, -1 if limit is None else limit))
         
-        conn.close()
-        return contacts
+        contacts = cursor.fetchall()
+        return self._records(contacts, columns)
 
-    def search_contacts(self, search_term):
-        """Search contacts by name, company, or notes"""
-        conn = sqlite3.connect(self.db_path)
+    def _search_contacts_like(self, search_term, columns, limit=None):
+        """Substring search used when FTS5 is unavailable"""
+        conn = self.pool.get()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM contacts 
+        cursor.execute(f'''
+            SELECT {', '.join(columns)} FROM contacts 
             WHERE name LIKE ? OR company LIKE ? OR notes LIKE ?
             ORDER BY relevance_score DESC
-        ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
+            LIMIT ?
+        ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%',
+              -1 if limit is None else limit))
         
         contacts = cursor.fetchall()
-        conn.close()
-        return contacts
+        return self._records(contacts, columns)
+
+    def fuzzy_index(self):
+        """The trigram index behind fuzzy_search, built from the database on
+        first use and then kept current from this manager's change events.
+        Writes made by other processes are only seen after rebuild_fuzzy_index."""
+        with self._fuzzy_lock:
+            if self._fuzzy is None:
+                from fuzzy_index import TrigramIndex
+                self._fuzzy = TrigramIndex()
+                self.subscribe(self._update_fuzzy_index)
+                self._fill_fuzzy_index(self._fuzzy)
+            return self._fuzzy
+
+    def rebuild_fuzzy_index(self):
+        from fuzzy_index import TrigramIndex
+        with self._fuzzy_lock:
+            index = TrigramIndex()
+            self._fill_fuzzy_index(index)
+            if self._fuzzy is None:
+                self.subscribe(self._update_fuzzy_index)
+            self._fuzzy = index
+        return index
+
+    def _fill_fuzzy_index(self, index):
+        cursor = self.pool.get().execute("SELECT id, name, company FROM contacts")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for contact_id, name, company in rows:
+                index.add(contact_id, name, company)
+
+    def _update_fuzzy_index(self, events):
+        index = self._fuzzy
+        conn = self.pool.get()
+        for event in events:
+            if event.kind == 'deleted':
+                for contact_id in event.ids:
+                    index.remove(contact_id)
+                continue
+            for start in range(0, len(event.ids), 500):
+                chunk = event.ids[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                found = set()
+                for contact_id, name, company in conn.execute(
+                        f"SELECT id, name, company FROM contacts WHERE id IN ({placeholders})",
+                        chunk):
+                    index.add(contact_id, name, company)
+                    found.add(contact_id)
+                for contact_id in set(chunk) - found:
+                    index.remove(contact_id)
+
+    def fuzzy_search(self, search_term, limit=20, threshold=0.3, columns=None):
+        """Typo-tolerant search on name and company.
+
+        Returns up to `limit` (Contact, similarity) pairs, most similar
+        first, where similarity says how closely the words of the term
+        match the words of the contact's name or company (whichever is
+        closer) and is at least `threshold`. See fuzzy_index for how terms
+        are scored.
+        """
+        columns = self._record_projection(columns)
+        best = self.fuzzy_index().search(search_term, threshold, limit)
+        if not best:
+            return []
+        placeholders = ', '.join('?' for _ in best)
+        rows = self.pool.get().execute(
+            f"SELECT {', '.join(columns)} FROM contacts WHERE id IN ({placeholders})",
+            [contact_id for contact_id, _ in best]).fetchall()
+        records = {record.id: record for record in self._records(rows, columns)}
+        return [(records[contact_id], score) for contact_id, score in best
+                if contact_id in records]
+
+    def find_duplicates(self, threshold=0.85, limit=None):
+        """Likely duplicate contacts as DuplicatePairs, best first.
+
+        Contacts sharing an email address (ignoring case and surrounding
+        spaces) score 1.0.
+        Other pairs are found through the trigram index and scored on
+        name and company similarity (TrigramIndex.name_pairs), so the
+        work grows with the number of similar names, not with N squared.
+        """
+        from fuzzy_index import DuplicatePair
+        pairs = {}
+        groups = self.pool.get().execute('''
+            SELECT group_concat(id) FROM contacts
+            WHERE email IS NOT NULL AND email != ''
+            GROUP BY lower(trim(email)) HAVING COUNT(*) > 1
+        ''')
+        for (ids,) in groups:
+            ids = sorted(int(contact_id) for contact_id in ids.split(','))
+            for i, first in enumerate(ids):
+                for second in ids[i + 1:]:
+                    pairs[first, second] = DuplicatePair(1.0, first, second, 'email')
+
+        for pair in self.fuzzy_index().name_pairs(threshold):
+            key = (pair.first_id, pair.second_id)
+            if key not in pairs:
+                pairs[key] = pair
+
+        found = sorted(pairs.values(),
+                       key=lambda pair: (-pair.score, pair.first_id, pair.second_id))
+        return found[:limit] if limit is not None else found
 
     def delete_contact(self, contact_id):
-        """Delete a contact from the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        self.log_history(contact_id, "Deleted", "Contact deleted")
+        """Delete a contact from the database; raises LookupError if there
+        is no such contact"""
+        with self.transaction() as conn:
+            cursor = conn.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+            if not cursor.rowcount:
+                raise LookupError(f"No contact with id {contact_id}")
+            self._invalidate(contact_id)
+            self._record_change('deleted', _cache_key(contact_id))
+            self.log_history(contact_id, "Deleted", "Contact deleted")
 
     def log_history(self, contact_id, action_type, notes=""):
-        """Log an action in the contact history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO contact_history (contact_id, action_type, notes)
-            VALUES (?, ?, ?)
-        ''', (contact_id, action_type, notes))
-        
-        conn.commit()
-        conn.close()
+        """Log an action in the contact history.
+
+        With history_batch_size set, the entry is buffered by the
+        HistoryWriter instead of written here. Inside a transaction it is
+        only handed over once that transaction commits, and a rollback
+        discards it along with the change it describes.
+        """
+        self._log_history_many((contact_id,), action_type, notes)
+
+    def _log_history_many(self, contact_ids, action_type, notes):
+        """log_history for many contacts with one executemany"""
+        keys = [_cache_key(contact_id) for contact_id in contact_ids]
+        if self.history_writer is not None:
+            from history_writer import history_timestamp
+            stamp = history_timestamp()
+            entries = [(key, action_type, stamp, notes) for key in keys]
+            if self.pool.in_transaction():
+                self._local.history.extend(entries)
+            else:
+                self.history_writer.add(entries)
+            return
+
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO contact_history (contact_id, action_type, notes)
+                VALUES (?, ?, ?)
+            ''', [(key, action_type, notes) for key in keys])
+            for key in keys:
+                self._invalidate(key, (self.history_cache,))
+
+    def flush_history(self):
+        """Write buffered history entries now; returns how many were written"""
+        if self.history_writer is None:
+            return 0
+        return self.history_writer.flush()
+
+    def _history_flushed(self, contact_ids):
+        for contact_id in contact_ids:
+            self.history_cache.invalidate(contact_id)
 
     def get_contact_history(self, contact_id):
-        """Get history for a specific contact"""
-        conn = sqlite3.connect(self.db_path)
+        """Get history for a specific contact, including buffered entries"""
+        if self.history_writer is not None:
+            return self.history_writer.history(
+                _cache_key(contact_id), lambda: self._load_history(contact_id))
+        return self._load_history(contact_id)
+
+    def _load_history(self, contact_id):
+        key = _cache_key(contact_id)
+        conn = self.pool.get()
+        self._check_external_writes(conn)
+        history = self._cached(self.history_cache, key)
+        if history is not None:
+            return list(history)
+
+        generation = self.history_cache.generation
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT action_type, action_date, notes 
             FROM contact_history 
             WHERE contact_id = ?
-            ORDER BY action_date DESC
+            ORDER BY action_date DESC, id DESC
         ''', (contact_id,))
         
         history = cursor.fetchall()
-        conn.close()
-        return history 
\ No newline at end of file
+        if not self.pool.in_transaction():
+            self.history_cache.put(key, tuple(history), generation)
+        return history
+
+    def _status_clause(self, status):
+        if status is None:
+            return "", []
+        return " AND status = ?", [status]
+
+    def get_agenda(self, until=None, limit=50, offset=0, columns=None, status=None):
+        """Contact records holding `columns` (AGENDA_COLUMNS by default)
+        whose follow-up is due on or before `until` (default today),
+        overdue first, in (follow_up_date, id) order.
+
+        Follow-up dates may carry a time, so the range is "before the day
+        after `until`"; it is read straight off the idx_contacts_due index.
+        """
+        columns = self._record_projection(columns, AGENDA_COLUMNS)
+        extra, params = self._status_clause(status)
+        rows = self.pool.get().execute(f'''
+            SELECT {', '.join(columns)} FROM contacts
+            WHERE follow_up_date < ?{extra}
+            ORDER BY follow_up_date, id
+            LIMIT ? OFFSET ?
+        ''', [_next_day(until)] + params + [limit, offset]).fetchall()
+        return self._records(rows, columns)
+
+    def count_due(self, until=None, status=None):
+        """Number of contacts get_agenda would return without a limit"""
+        extra, params = self._status_clause(status)
+        return self.pool.get().execute(f'''
+            SELECT COUNT(*) FROM contacts WHERE follow_up_date < ?{extra}
+        ''', [_next_day(until)] + params).fetchone()[0]
+
+    def get_summary(self, today=None, top=10):
+        """Dashboard counts as a summary.Summary: contacts in total, by
+        status and by relevance bucket, the `top` largest companies, and
+        follow-ups overdue, due today and upcoming relative to `today`.
+
+        Read from the contact_summary table, which triggers keep exact on
+        every write, so this costs a few index lookups at any size.
+        """
+        return summary.read_summary(self.pool.get(), _day(today), top)
+
+    def rebuild_summary(self):
+        """Recount the summary table from contacts, e.g. to repair it after
+        writes made with its triggers disabled; returns the rows written"""
+        with self.transaction() as conn:
+            return summary.rebuild_summary(conn.cursor())
+
+    def check_summary(self):
+        """Stored counts that disagree with a full recount, as
+        (dimension, value, stored, actual) rows; empty when consistent"""
+        return summary.check_summary(self.pool.get().cursor())
+
+    def next_due(self, count=10, since=None, after=None, columns=None, status=None):
+        """Contact records for the next `count` follow-ups scheduled on or
+        after `since` (default today) in date order. Pass the last record's
+        (follow_up_date, id) as `after` to continue from there."""
+        columns = self._record_projection(columns, AGENDA_COLUMNS)
+        extra, params = self._status_clause(status)
+        # As in get_contacts_page, continuing after a cursor reads two index
+        # ranges (the rest of its date, then later dates) rather than one OR
+        if after is None:
+            segments = [("follow_up_date >= ?", [_day(since)], "follow_up_date, id")]
+        else:
+            segments = [("follow_up_date = ? AND id > ?", list(after), "id"),
+                        ("follow_up_date > ?", [after[0]], "follow_up_date, id")]
+
+        conn = self.pool.get()
+        rows = []
+        for bound, bound_params, order in segments:
+            rows.extend(conn.execute(f'''
+                SELECT {', '.join(columns)} FROM contacts
+                WHERE {bound}{extra}
+                ORDER BY {order}
+                LIMIT ?
+            ''', bound_params + params + [count - len(rows)]))
+            if len(rows) >= count:
+                break
+        return self._records(rows, columns)
+
+    def reschedule(self, contact_ids, follow_up_date):
+        """Set the follow-up date of many contacts in one transaction
+        (None clears it); returns how many contacts were changed"""
+        new_date = None if follow_up_date is None else _day(follow_up_date)
+        keys = [_cache_key(contact_id) for contact_id in contact_ids]
+        changed = []
+        with self.transaction() as conn:
+            for key in keys:
+                cursor = conn.execute("UPDATE contacts SET follow_up_date = ? WHERE id = ?",
+                                      (new_date, key))
+                if cursor.rowcount:
+                    changed.append(key)
+                    self._invalidate(key)
+                    self.log_history(key, "Rescheduled",
+                                     f"Follow-up {'cleared' if new_date is None else 'set to ' + new_date}")
+            if changed:
+                self._record_change('updated', *changed)
+        return len(changed)
+
+    def snooze(self, contact_ids, days=1, today=None):
+        """Push follow-ups `days` days past today; overdue ones included"""
+        target = date.fromisoformat(_day(today)) + timedelta(days=days)
+        return self.reschedule(contact_ids, target)
+
+    def compact_history(self, policy, archive_path=None, batch_size=200, pause=0.0,
+                        vacuum=True):
+        """Trim contact_history according to a retention.RetentionPolicy in
+        small transactions; see retention.compact_history"""
+        import retention
+        return retention.compact_history(self, policy, archive_path, batch_size,
+                                         pause, vacuum)
+
+    def last_change_seq(self):
+        """Sequence number of the newest logged change (0 if none)"""
+        return change_log.last_seq(self.pool.get())
+
+    def changes_since(self, seq=0, batch_size=1000, limit=None):
+        """Yield change_log.Change records for every write after `seq`,
+        oldest first.
+
+        Changes are read batch_size at a time by seq, each batch in its own
+        short read, so a consumer can take as long as it likes and the cost
+        depends on how much changed, not on the size of contacts. Keep the
+        last yielded seq and pass it next time. Raises LookupError if
+        changes after `seq` have already been trimmed; the consumer then
+        has to start over from sync_snapshot.
+        """
+        conn = self.pool.get()
+        oldest = change_log.oldest_seq(conn)
+        if seq < oldest - 1:
+            raise LookupError(f"Changes {seq + 1} to {oldest - 1} have been trimmed from "
+                              f"the change log; start over from a full snapshot")
+        columns = ', '.join(change_log.CHANGE_COLUMNS)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            rows = conn.execute(f'''
+                SELECT {columns} FROM contact_changes
+                WHERE seq > ? ORDER BY seq LIMIT ?
+            ''', (seq, size)).fetchall()
+            for row in rows:
+                yield change_log.decode(row)
+            if len(rows) < size:
+                return
+            seq = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    @contextmanager
+    def sync_snapshot(self, batch_size=1000):
+        """Context manager yielding (seq, contacts) to start a new mirror
+        from: contacts iterates every contact as a dict of its columns, as
+        of change seq. Follow it with changes_since(seq).
+
+        Everything is read in one read transaction, held until the block
+        exits; writers are not held up meanwhile.
+        """
+        with self.pool.read_transaction() as conn:
+            seq = change_log.last_seq(conn)
+            yield seq, self._iter_contact_dicts(conn, batch_size)
+
+    def _iter_contact_dicts(self, conn, batch_size):
+        cursor = conn.execute("SELECT * FROM contacts ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(CONTACT_COLUMNS, row))
+
+    def trim_changes(self, through_seq):
+        """Delete logged changes up to and including through_seq, once
+        every consumer has applied them; returns how many were deleted"""
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM contact_changes WHERE seq <= ?",
+                                (through_seq,)).rowcount
+
+    def backup(self, target, progress=None):
+        """Copy the whole database to `target`, a file path or an open
+        sqlite3.Connection, with SQLite's online backup API.
+
+        The copy is taken in a single step, inside one read transaction, so
+        it is a consistent point-in-time image; under WAL other connections
+        keep writing while it runs. (A stepwise backup would start over
+        every time another connection wrote.) Buffered history is flushed
+        first so the copy includes it.
+        """
+        if self.pool.in_transaction():
+            raise sqlite3.ProgrammingError("backup() can't run inside a transaction")
+        self.flush_history()
+        source = self.pool.get()
+        if not isinstance(target, str):
+            source.backup(target, progress=progress)
+            return
+        dest = sqlite3.connect(target)
+        try:
+            source.backup(dest, progress=progress)
+        finally:
+            dest.close()
+
+    def snapshot(self, path=":memory:", read_only=False):
+        """Point-in-time copy of the database (see backup), opened as a new
+        ContactManager. Long reports and exports can run against it for as
+        long as they like without touching the live file. The caller
+        closes it."""
+        if path != ":memory:":
+            self.backup(path)
+            return ContactManager(path, read_only=read_only)
+        copy = ContactManager(":memory:")
+        self.backup(copy.pool.get())
+        # Pick up the copied schema's version and FTS index
+        copy.setup_database()
+        return copy
+
+    def report(self, name, processes=None, **options):
+        """Run an aggregate report from reports.REPORTS over id ranges in
+        a pool of read-only worker processes; see reports.run_report"""
+        import reports
+        if self.db_path == ":memory:":
+            return reports.run_report(self.db_path, name, 1, self.pool.get(), **options)
+        return reports.run_report(self.db_path, name, processes, **options)
+
+    def import_contacts(self, records, chunk_size=1000):
+        """Bulk insert contacts from an iterable of (row_number, record) pairs.
+
+        Records are validated one by one; invalid rows are skipped and
+        reported rather than aborting the import. Valid rows are written
+        with executemany, one transaction per chunk, and their "Created"
+        history rows are inserted by a single INSERT ... SELECT per chunk.
+        Returns a dict with imported/errors/elapsed/rows_per_sec.
+        """
+        placeholders = ', '.join('?' for _ in IMPORT_FIELDS)
+        insert_sql = f"INSERT INTO contacts ({', '.join(IMPORT_FIELDS)}) VALUES ({placeholders})"
+        imported = 0
+        errors = []
+        start = time.perf_counter()
+
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            rows = []
+            for row_number, record in chunk:
+                if isinstance(record, Exception):
+                    errors.append((row_number, str(record)))
+                    continue
+                try:
+                    rows.append(validate_import_record(record))
+                except ValueError as e:
+                    errors.append((row_number, str(e)))
+            if not rows:
+                continue
+
+            with self.transaction() as conn:
+                # BEGIN IMMEDIATE holds the write lock, so every id above
+                # the current maximum belongs to this chunk.
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM contacts").fetchone()[0]
+                conn.executemany(insert_sql, rows)
+                conn.execute('''
+                    INSERT INTO contact_history (contact_id, action_type, notes)
+                    SELECT id, 'Created', 'Initial contact created'
+                    FROM contacts WHERE id > ?
+                ''', (last_id,))
+                if self._listeners:
+                    new_ids = conn.execute("SELECT id FROM contacts WHERE id > ?", (last_id,))
+                    self._record_change('inserted', *(row[0] for row in new_ids))
+            imported += len(rows)
+
+        elapsed = time.perf_counter() - start
+        return {
+            'imported': imported,
+            'errors': errors,
+            'elapsed': elapsed,
+            'rows_per_sec': imported / elapsed if elapsed else 0.0,
+        }
+
+    def import_file(self, path, fmt=None, chunk_size=1000):
+        """Stream a CSV, TSV or JSONL file into the database via import_contacts"""
+        import bulk_io
+        return self.import_contacts(bulk_io.read_records(path, fmt), chunk_size)
+
+    def iter_contacts(self, batch_size=1000):
+        """Yield every contact in id order, fetching batch_size rows at a time"""
+        conn = self.pool.get()
+        cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM contacts ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def export_file(self, path, fmt=None):
+        """Stream all contacts to a CSV, TSV or JSONL file ('-' for stdout)"""
+        import bulk_io
+        fmt = bulk_io.detect_format(path, fmt)
+        if path == '-':
+            return bulk_io.write_records(self.iter_contacts(), EXPORT_COLUMNS, sys.stdout, fmt)
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            return bulk_io.write_records(self.iter_contacts(), EXPORT_COLUMNS, handle, fmt)
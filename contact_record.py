@@ -0,0 +1,72 @@
+"""Compact record type for rows of the contacts table."""
+
+# Columns of the contacts table, in table order (the shape of SELECT *)
+CONTACT_COLUMNS = ('id', 'name', 'company', 'role', 'email', 'linkedin_url',
+                   'relevance_score', 'notes', 'last_contact_date',
+                   'follow_up_date', 'status', 'created_at')
+
+# What list and search views show; notes and the other wide fields stay in
+# the database until a record is opened
+SUMMARY_COLUMNS = ('id', 'name', 'company', 'relevance_score')
+
+
+class Contact:
+    """One contact, holding only the columns that were selected.
+
+    Attributes are named after the table columns. A column that wasn't
+    selected is fetched from the database the first time it is read (along
+    with every other missing column, in one query, by id), so a record
+    built from a narrow projection that includes id behaves like a full
+    one; ContactManager always selects it. Records also index like
+    the SELECT * tuples they replace, so contact[7] is contact.notes.
+    """
+
+    __slots__ = CONTACT_COLUMNS + ('_loader',)
+
+    def __init__(self, values, columns=CONTACT_COLUMNS, loader=None):
+        for column, value in zip(columns, values):
+            setattr(self, column, value)
+        self._loader = loader
+
+    def __getattr__(self, name):
+        # Only reached for slots that haven't been assigned yet
+        if name in CONTACT_COLUMNS and self._loader is not None:
+            loader, self._loader = self._loader, None
+            loader(self)
+            return getattr(self, name)
+        raise AttributeError(f"{type(self).__name__!s} has no attribute {name!r}")
+
+    def missing_columns(self):
+        """Columns that haven't been loaded yet"""
+        return tuple(column for column in CONTACT_COLUMNS if not self.is_loaded(column))
+
+    def is_loaded(self, column):
+        try:
+            object.__getattribute__(self, column)
+        except AttributeError:
+            return False
+        return True
+
+    def fill(self, columns, values):
+        """Store values for columns that were fetched later"""
+        for column, value in zip(columns, values):
+            setattr(self, column, value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(getattr(self, column) for column in CONTACT_COLUMNS[index])
+        return getattr(self, CONTACT_COLUMNS[index])
+
+    def __len__(self):
+        return len(CONTACT_COLUMNS)
+
+    def __iter__(self):
+        return (getattr(self, column) for column in CONTACT_COLUMNS)
+
+    def as_dict(self, columns=CONTACT_COLUMNS):
+        return {column: getattr(self, column) for column in columns}
+
+    def __repr__(self):
+        loaded = ', '.join(f"{column}={object.__getattribute__(self, column)!r}"
+                           for column in CONTACT_COLUMNS if self.is_loaded(column))
+        return f"Contact({loaded})"
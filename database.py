@@ -0,0 +1,170 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+# Tuned for an interactive, single-file CRM database: WAL lets readers run
+# alongside a writer, and synchronous=NORMAL only fsyncs at checkpoints.
+# auto_vacuum only takes effect on a new file, before its first table.
+DEFAULT_PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# For read-only connections: nothing that writes the file header, and
+# query_only as a second guard. A WAL database stays readable while other
+# connections write to it.
+READ_ONLY_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def connect(db_path, read_only=False):
+    """Open a connection in autocommit mode, read-only if asked; a
+    read-only connection never creates the file"""
+    if read_only:
+        return sqlite3.connect(f"file:{quote(db_path)}?mode=ro", uri=True,
+                               check_same_thread=False, isolation_level=None)
+    return sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections, one per thread"""
+
+    def __init__(self, db_path, pragmas=None, read_only=False):
+        if read_only and db_path == ":memory:":
+            raise ValueError("An in-memory database can't be opened read-only")
+        self.db_path = db_path
+        self.read_only = read_only
+        if pragmas is None:
+            pragmas = READ_ONLY_PRAGMAS if read_only else DEFAULT_PRAGMAS
+        self.pragmas = pragmas
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._shared = None
+        self._closed = False
+        # Set to an instrumentation.QueryStats to profile every statement
+        self.stats = None
+
+    def _open(self):
+        """Open and configure a new connection"""
+        start = time.perf_counter()
+        # Autocommit mode: transactions are opened explicitly by transaction()
+        conn = connect(self.db_path, self.read_only)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        if self.stats is not None:
+            self.stats.record_connect(time.perf_counter() - start)
+        return conn
+
+    def _wrap(self, conn):
+        if self.stats is None:
+            return conn
+        # Only imported when profiling; it pulls in json and logging
+        from instrumentation import InstrumentedConnection
+        return InstrumentedConnection(conn, self.stats)
+
+    def get(self):
+        """Return the connection owned by the calling thread"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        if self.db_path == ":memory:":
+            # Every connection to :memory: is a separate database, so all
+            # threads share one connection instead.
+            with self._lock:
+                if self._shared is None:
+                    self._shared = self._open()
+                    self._connections.append(self._shared)
+            return self._wrap(self._shared)
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return self._wrap(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding the calling thread's connection"""
+        yield self.get()
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in one transaction on this thread's
+        connection. Nested calls join the outermost transaction, which
+        commits on clean exit and rolls back if an exception escapes."""
+        if self.read_only:
+            raise sqlite3.OperationalError(f"{self.db_path} is open read-only")
+        conn = self.get()
+        depth = getattr(self._local, 'depth', 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield conn
+            finally:
+                self._local.depth = depth
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    @contextmanager
+    def read_transaction(self):
+        """Run the enclosed reads against one snapshot of the database.
+        Takes no write lock; under WAL writers carry on meanwhile. Inside
+        transaction() it simply joins that transaction."""
+        conn = self.get()
+        if self.in_transaction():
+            yield conn
+            return
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def in_transaction(self):
+        """Whether the calling thread is inside transaction()"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def close(self):
+        """Close every connection handed out by the pool"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for conn in self._connections:
+                try:
+                    conn.execute("PRAGMA optimize")
+                except sqlite3.Error:
+                    pass
+                conn.close()
+            self._connections.clear()
+            self._shared = None
+
+    @property
+    def closed(self):
+        return self._closed
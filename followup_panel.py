@@ -0,0 +1,114 @@
+import tkinter as tk
+from datetime import date
+from tkinter import ttk
+
+COLUMNS = ('id', 'name', 'company', 'follow_up_date', 'status')
+HEADINGS = ('ID', 'Name', 'Company', 'Due', 'Status')
+
+
+class FollowUpPanel:
+    """Agenda of due and overdue follow-ups for the GUI.
+
+    Built the first time it is opened, and only queries the database while
+    it is shown. Rows are fetched PAGE_SIZE at a time from get_agenda as
+    the list is scrolled to the bottom. Selected contacts can be snoozed
+    or have their follow-up cleared in one transaction.
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(self, parent, cm, on_open_contact, colors):
+        self.cm = cm
+        self.on_open_contact = on_open_contact
+        self.visible = False
+        self.loaded = 0
+        self.exhausted = False
+
+        self.frame = ttk.Frame(parent)
+        header = ttk.Frame(self.frame)
+        header.pack(fill=tk.X, padx=5, pady=10)
+        ttk.Label(header, text="Follow-ups").pack(side=tk.LEFT)
+        self.count_label = ttk.Label(header, text="")
+        self.count_label.pack(side=tk.RIGHT)
+
+        list_frame = ttk.Frame(self.frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.tree = ttk.Treeview(list_frame, columns=HEADINGS, show='headings',
+                                 selectmode='extended')
+        for heading in HEADINGS:
+            self.tree.heading(heading, text=heading)
+        self.tree.column('ID', width=50)
+        self.tree.column('Due', width=90)
+        self.tree.column('Status', width=80)
+        self.tree.tag_configure('overdue', foreground=colors['warning'])
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind('<Double-1>', self.on_double_click)
+
+        buttons = ttk.Frame(self.frame)
+        buttons.pack(fill=tk.X, padx=5, pady=10)
+        ttk.Button(buttons, text="Snooze 1 day",
+                   command=lambda: self.snooze(1)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(buttons, text="Snooze 1 week",
+                   command=lambda: self.snooze(7)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(buttons, text="Done", command=self.clear,
+                   style='Accent.TButton').pack(side=tk.LEFT, padx=2)
+
+    def show(self):
+        self.visible = True
+        self.refresh()
+
+    def hide(self):
+        self.visible = False
+
+    def refresh(self):
+        """Reload from the first page, e.g. after the agenda changed"""
+        self.tree.delete(*self.tree.get_children())
+        self.loaded = 0
+        self.exhausted = False
+        self.today = date.today().isoformat()
+        self.count_label.configure(text=f"{self.cm.count_due()} due")
+        self.load_more()
+
+    def load_more(self):
+        if self.exhausted:
+            return
+        contacts = self.cm.get_agenda(limit=self.PAGE_SIZE, offset=self.loaded,
+                                      columns=COLUMNS)
+        for contact in contacts:
+            due = contact.follow_up_date
+            overdue = due is not None and due[:10] < self.today
+            self.tree.insert('', 'end', iid=str(contact.id),
+                             values=tuple(getattr(contact, column) for column in COLUMNS),
+                             tags=('overdue',) if overdue else ())
+        self.loaded += len(contacts)
+        self.exhausted = len(contacts) < self.PAGE_SIZE
+
+    def selected_ids(self):
+        return [int(iid) for iid in self.tree.selection()]
+
+    def snooze(self, days):
+        ids = self.selected_ids()
+        if ids:
+            self.cm.snooze(ids, days)
+
+    def clear(self):
+        ids = self.selected_ids()
+        if ids:
+            self.cm.reschedule(ids, None)
+
+    def apply_changes(self, events):
+        if self.visible:
+            self.refresh()
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0 and not self.exhausted and self.loaded:
+            self.load_more()
+
+    def on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if iid:
+            self.on_open_contact(int(iid))
@@ -0,0 +1,313 @@
+"""In-memory trigram index over contact names and companies.
+
+Strings are folded like the FTS index (casefold, no diacritics) and split
+into words. Each distinct word is broken into pg_trgm-style trigrams (two
+spaces in front, one behind, so "acme" gives "  a", " ac", "acm", "cme",
+"me "), and two words are as similar as the Jaccard index of their
+trigram sets.
+
+Matching works word by word. A query word is looked up among the distinct
+indexed words, which is a much smaller set than the contacts, and a
+value's score is the mean over the query words of the best similarity of
+any word in it. "Grace Hoper" therefore finds "Grace Hopper" (1.0 for
+grace, 0.62 for hopper) without comparing it to every contact.
+
+Word lookups use prefix filtering: a word with similarity >= t to a query
+word of n trigrams shares at least ceil(t * n) of them, so it has to
+appear in one of the n - ceil(t * n) + 1 rarest posting lists. Only those
+lists are scanned, and each candidate is then scored exactly.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict, namedtuple
+
+from search_index import fold_text
+
+FIELDS = ('name', 'company')
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# A likely duplicate: score in [0, 1], the two contact ids (first < second)
+# and why they matched ('email' or 'name')
+DuplicatePair = namedtuple('DuplicatePair', ['score', 'first_id', 'second_id', 'reason'])
+
+
+def normalize(text):
+    return ' '.join(_WORD_RE.findall(fold_text(text or '')))
+
+
+def trigrams(value):
+    """Trigram set of an already normalized value"""
+    grams = set()
+    for word in value.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def deletions(word):
+    """The word and every string one deleted character away from it; two
+    words within one edit of each other always have one of these in common"""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class _FieldIndex:
+    """Words, trigrams and owners for one field; callers hold the lock"""
+
+    def __init__(self):
+        self.word_grams = {}
+        self.gram_words = defaultdict(set)
+        self.word_values = defaultdict(set)
+        self.owners = defaultdict(set)
+
+    def add(self, value, contact_id):
+        owners = self.owners[value]
+        if not owners:
+            for word in set(value.split()):
+                values = self.word_values[word]
+                if not values:
+                    grams = trigrams(word)
+                    self.word_grams[word] = grams
+                    for gram in grams:
+                        self.gram_words[gram].add(word)
+                values.add(value)
+        owners.add(contact_id)
+
+    def remove(self, value, contact_id):
+        owners = self.owners[value]
+        owners.discard(contact_id)
+        if owners:
+            return
+        del self.owners[value]
+        for word in set(value.split()):
+            values = self.word_values[word]
+            values.discard(value)
+            if values:
+                continue
+            del self.word_values[word]
+            for gram in self.word_grams.pop(word):
+                words = self.gram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self.gram_words[gram]
+
+    def similar_words(self, word, threshold):
+        """[(indexed word, similarity)] at least `threshold` similar to word"""
+        grams = trigrams(word)
+        if not grams:
+            return []
+        required = max(1, math.ceil(threshold * len(grams)))
+        lists = sorted((self.gram_words.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for words in lists[:len(grams) - required + 1]:
+            candidates.update(words)
+        # Jaccard >= t also bounds the size of the other set
+        size = len(grams)
+        shortest, longest = threshold * size, size / threshold
+        matches = []
+        for candidate in candidates:
+            other = self.word_grams[candidate]
+            if not shortest <= len(other) <= longest:
+                continue
+            shared = len(grams & other)
+            score = shared / (size + len(other) - shared)
+            if score >= threshold:
+                matches.append((candidate, score))
+        return matches
+
+    def best_scores(self, matches, floor):
+        """{indexed value: best score} over word matches scoring >= floor"""
+        best = {}
+        # Ascending order, so each value ends up with its best score
+        for match, score in sorted(matches, key=lambda match: match[1]):
+            if score >= floor:
+                best.update(dict.fromkeys(self.word_values[match], score))
+        return best
+
+    def search(self, value, threshold, limit=None):
+        """{indexed value: score} for values scoring at least threshold.
+        With a limit, only the best `limit` values are guaranteed to be
+        included."""
+        words = value.split()
+        if not words:
+            return {}
+        # A word below the threshold can still lift a multi-word score
+        matches = [self.similar_words(word, threshold / len(words)) for word in words]
+        if len(words) == 1:
+            return self.best_scores(matches[0], threshold)
+
+        if limit is not None:
+            # Values matching every word well usually fill the limit. If
+            # the limit-th best of them is good enough that any better
+            # value must match every word that well, they are the answer.
+            bests = [self.best_scores(word_matches, threshold) for word_matches in matches]
+            common = set(bests[0]).intersection(*bests[1:])
+            found = {candidate: sum(best[candidate] for best in bests) / len(words)
+                     for candidate in common}
+            if len(found) >= limit:
+                kth = heapq.nlargest(limit, found.values())[-1]
+                if len(words) * kth - (len(words) - 1) >= threshold:
+                    return found
+
+        bests = [self.best_scores(word_matches, 0.0) for word_matches in matches]
+        needed = threshold * len(words)
+        found = {}
+        for candidate in set().union(*bests):
+            total = sum(best.get(candidate, 0.0) for best in bests)
+            if total >= needed:
+                found[candidate] = total / len(words)
+        return found
+
+
+class TrigramIndex:
+    """Thread-safe fuzzy index of (name, company) per contact id"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._contacts = {}
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def add(self, contact_id, name, company):
+        """Index a contact, replacing whatever was indexed for it before"""
+        values = (normalize(name), normalize(company))
+        with self._lock:
+            if self._contacts.get(contact_id) == values:
+                return
+            self.remove(contact_id)
+            self._contacts[contact_id] = values
+            for field, value in zip(FIELDS, values):
+                if value:
+                    self._fields[field].add(value, contact_id)
+
+    def remove(self, contact_id):
+        with self._lock:
+            values = self._contacts.pop(contact_id, None)
+            if values is None:
+                return
+            for field, value in zip(FIELDS, values):
+                if value:
+                    self._fields[field].remove(value, contact_id)
+
+    def search(self, term, threshold=0.3, limit=None):
+        """[(contact_id, score)] best first, where score is how well the
+        term matches the contact's name or company, whichever is closer.
+        Ties go to the shorter value, then the lower id."""
+        value = normalize(term)
+        with self._lock:
+            ranked = []
+            for field in FIELDS:
+                index = self._fields[field]
+                ranked.extend((-score, len(match), match, field)
+                              for match, score in index.search(value, threshold, limit).items())
+            # A contact is indexed under at most two values, so the best
+            # 2 * limit values always cover the best `limit` contacts
+            if limit is not None:
+                ranked = heapq.nsmallest(2 * limit, ranked)
+            else:
+                ranked.sort()
+
+            scores = {}
+            for negative, _, match, field in ranked:
+                for contact_id in sorted(self._fields[field].owners[match]):
+                    if contact_id not in scores:
+                        scores[contact_id] = -negative
+                if limit is not None and len(scores) >= limit:
+                    break
+        found = list(scores.items())
+        return found[:limit] if limit is not None else found
+
+    def name_pairs(self, threshold):
+        """DuplicatePairs of contacts whose combined name (70%) and company
+        (30%) similarity reaches threshold; a contact with no company is
+        scored on its name alone.
+
+        Candidates are blocked on one word of each name, the one with the
+        fewest near neighbours: a name is only compared with names
+        containing a word within one edit of it, found through a deletion
+        index, so the work grows with the number of similar names rather
+        than with N squared. Pairs whose blocking words both differ by more
+        than one edit are not reported.
+
+        The words, owners and companies are copied under the lock and
+        scored outside it, so a long scan doesn't hold up add and remove
+        (and with them every commit that updates the index).
+        """
+        minimum = max((threshold - 0.3) / 0.7, 0.01)
+        names = self._fields['name']
+        pairs = []
+        seen = set()
+        with self._lock:
+            word_values = {word: tuple(values)
+                           for word, values in names.word_values.items() if values}
+            value_owners = {value: tuple(ids) for value, ids in names.owners.items() if ids}
+            companies = {contact_id: values[1] for contact_id, values in self._contacts.items()}
+        neighbours = defaultdict(set)
+        for word in word_values:
+            for key in deletions(word):
+                neighbours[key].add(word)
+        similar = {}
+        for word in word_values:
+            similar[word] = set().union(*(neighbours[key] for key in deletions(word)))
+        # How many names each word would pull in as candidates
+        block_size = {word: sum(len(word_values[other]) for other in words)
+                      for word, words in similar.items()}
+        grams = {value: trigrams(value) for value in value_owners}
+        for value in sorted(value_owners):
+            rarest = min(value.split(), key=lambda word: (block_size[word], word))
+            candidates = set()
+            for word in similar[rarest]:
+                candidates.update(word_values[word])
+            owners = sorted(value_owners[value])
+            value_grams = grams[value]
+            shortest, longest = minimum * len(value_grams), len(value_grams) / minimum
+            for other in sorted(candidates):
+                if other == value:
+                    name_score = 1.0
+                    found = [(first, second) for first in owners for second in owners
+                             if first < second]
+                else:
+                    other_grams = grams[other]
+                    if not shortest <= len(other_grams) <= longest:
+                        continue
+                    name_score = similarity(value_grams, other_grams)
+                    if name_score < minimum:
+                        continue
+                    found = [(min(first, second), max(first, second))
+                             for first in owners for second in value_owners[other]]
+                for pair in found:
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    score = self._pair_score(pair, name_score, grams, companies)
+                    if score >= threshold:
+                        pairs.append(DuplicatePair(score, pair[0], pair[1], 'name'))
+        return pairs
+
+    @staticmethod
+    def _grams(cache, value):
+        grams = cache.get(value)
+        if grams is None:
+            grams = cache[value] = trigrams(value)
+        return grams
+
+    @classmethod
+    def _pair_score(cls, pair, name_score, grams, companies):
+        first, second = (companies[contact_id] for contact_id in pair)
+        if not first or not second:
+            return name_score
+        if first == second:
+            return 0.7 * name_score + 0.3
+        company_score = similarity(cls._grams(grams, first), cls._grams(grams, second))
+        return 0.7 * name_score + 0.3 * company_score
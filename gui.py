@@ -1,18 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from contact_manager import ContactManager
-from datetime import datetime
-import tkinter.font as tkfont
+from virtual_list import VirtualContactList
+from search_pipeline import SearchPipeline
+from summary_strip import SummaryStrip
+
+# Columns shown in the contact list; notes and other wide fields are only
+# loaded when a contact is selected.
+LIST_COLUMNS = ('id', 'name', 'company', 'relevance_score')
 
 class ContactManagerGUI:
-    def __init__(self, root):
+    def __init__(self, root, db_path="contacts.db"):
         self.root = root
         self.root.title("Contact Manager")
-        self.cm = ContactManager()
+        self.cm = ContactManager(db_path)
         
         # Setup dark theme
         self.setup_dark_theme()
         
+        # Dashboard counts across the top
+        self.summary_strip = SummaryStrip(root, self.root, self.cm, self.colors)
+        self.summary_strip.frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+
         # Create main container
         self.main_container = ttk.PanedWindow(root, orient=tk.HORIZONTAL)
         self.main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -31,17 +40,23 @@ class ContactManagerGUI:
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, style='Dark.TEntry')
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        # Contact list
-        self.contact_tree = ttk.Treeview(self.left_frame, columns=('ID', 'Name', 'Company', 'Relevance'),
-                                       show='headings')
-        self.contact_tree.heading('ID', text='ID')
-        self.contact_tree.heading('Name', text='Name')
-        self.contact_tree.heading('Company', text='Company')
-        self.contact_tree.heading('Relevance', text='Relevance')
+        # Contact list: a windowed view that only holds the visible rows
+        list_frame = ttk.Frame(self.left_frame)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=10)
+        self.contact_tree = ttk.Treeview(list_frame, columns=('ID', 'Name', 'Company', 'Relevance'),
+                                       show='headings', selectmode='browse')
         self.contact_tree.column('ID', width=50)
         self.contact_tree.column('Relevance', width=70)
-        self.contact_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=10)
+        list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        list_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.contact_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.contact_tree.bind('<<TreeviewSelect>>', self.on_select_contact)
+        self.contact_list = VirtualContactList(self.contact_tree, list_scrollbar, self.cm,
+                                               LIST_COLUMNS, ('ID', 'Name', 'Company', 'Relevance'))
+        self.search_pipeline = SearchPipeline(self.root, self.cm, self.contact_list)
+        self.cm.subscribe(self.on_contacts_changed)
+        self.current_contact_id = None
+        self.followup_panel = None
         
         # Buttons frame
         btn_frame = ttk.Frame(self.left_frame)
@@ -52,6 +67,8 @@ class ContactManagerGUI:
         ttk.Button(btn_frame, text="Delete",
                   command=self.delete_contact,
                   style='Warning.TButton').pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Follow-ups",
+                  command=self.toggle_followups).pack(side=tk.RIGHT, padx=2)
         
         # Right panel - Contact details
         self.right_frame = ttk.Frame(self.main_container)
@@ -60,7 +77,22 @@ class ContactManagerGUI:
         # Contact details form
         self.setup_contact_form()
         
+        # Show the window first; the first page of contacts follows
+        self.root.after_idle(self.load_contacts)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def load_contacts(self):
+        """First fill of the contact list, once Tk has drawn the window"""
+        self.root.update_idletasks()
         self.refresh_contacts()
+        self.summary_strip.refresh()
+
+    def on_close(self):
+        """Release database connections and close the window"""
+        self.search_pipeline.close()
+        self.summary_strip.close()
+        self.cm.close()
+        self.root.destroy()
 
     def setup_dark_theme(self):
         """Configure dark theme colors and styles"""
@@ -205,50 +237,70 @@ class ContactManagerGUI:
         )
 
     def refresh_contacts(self):
-        for item in self.contact_tree.get_children():
-            self.contact_tree.delete(item)
-        
-        contacts = self.cm.get_all_contacts()
-        for contact in contacts:
-            self.contact_tree.insert('', 'end', values=(contact[0], contact[1], contact[2], contact[6]))
+        self.search_pipeline.invalidate()
+        self.contact_list.reload()
 
-    def on_search(self, *args):
-        search_term = self.search_var.get()
-        for item in self.contact_tree.get_children():
-            self.contact_tree.delete(item)
-        
-        if search_term:
-            contacts = self.cm.search_contacts(search_term)
+    def on_contacts_changed(self, events):
+        """Patch only the affected rows after a save or delete"""
+        self.search_pipeline.invalidate()
+        self.contact_list.apply_changes(events)
+        self.summary_strip.apply_changes(events)
+        if self.followup_panel is not None:
+            self.followup_panel.apply_changes(events)
+
+    def toggle_followups(self):
+        """Show or hide the follow-up agenda, building it on first use"""
+        if self.followup_panel is None:
+            from followup_panel import FollowUpPanel
+            self.followup_panel = FollowUpPanel(self.main_container, self.cm,
+                                                self.open_contact, self.colors)
+        if self.followup_panel.visible:
+            self.main_container.forget(self.followup_panel.frame)
+            self.followup_panel.hide()
         else:
-            contacts = self.cm.get_all_contacts()
-            
-        for contact in contacts:
-            self.contact_tree.insert('', 'end', values=(contact[0], contact[1], contact[2], contact[6]))
+            self.main_container.add(self.followup_panel.frame)
+            self.followup_panel.show()
+
+    def open_contact(self, contact_id):
+        """Select a contact from elsewhere (the follow-up panel)"""
+        self.contact_list.select(contact_id)
+        self.contact_list.scroll_to_selected()
+        self.show_contact(contact_id)
+
+    def on_search(self, *args):
+        self.search_pipeline.submit(self.search_var.get())
 
     def on_select_contact(self, event):
         selection = self.contact_tree.selection()
         if not selection:
             return
         
-        contact_id = self.contact_tree.item(selection[0])['values'][0]
-        contacts = self.cm.get_all_contacts()
-        contact = next((c for c in contacts if c[0] == contact_id), None)
+        contact_id = int(selection[0])
+        self.contact_list.select(contact_id)
+        if contact_id == self.current_contact_id:
+            return  # Re-selected after scrolling; keep any unsaved edits
+        self.show_contact(contact_id)
+
+    def show_contact(self, contact_id):
+        """Load a contact and its history into the form"""
+        contact = self.cm.get_contact(contact_id)
+        self.current_contact_id = contact_id
         
         if contact:
             self.fields['name'].delete(0, tk.END)
-            self.fields['name'].insert(0, contact[1])
+            self.fields['name'].insert(0, contact.name)
             self.fields['company'].delete(0, tk.END)
-            self.fields['company'].insert(0, contact[2] or '')
+            self.fields['company'].insert(0, contact.company or '')
             self.fields['role'].delete(0, tk.END)
-            self.fields['role'].insert(0, contact[3] or '')
+            self.fields['role'].insert(0, contact.role or '')
             self.fields['email'].delete(0, tk.END)
-            self.fields['email'].insert(0, contact[4] or '')
+            self.fields['email'].insert(0, contact.email or '')
             self.fields['linkedin_url'].delete(0, tk.END)
-            self.fields['linkedin_url'].insert(0, contact[5] or '')
+            self.fields['linkedin_url'].insert(0, contact.linkedin_url or '')
             self.fields['relevance_score'].delete(0, tk.END)
-            self.fields['relevance_score'].insert(0, str(contact[6]))
+            self.fields['relevance_score'].insert(0, str(contact.relevance_score))
             self.fields['notes'].delete('1.0', tk.END)
-            self.fields['notes'].insert('1.0', contact[7] or '')
+            self.fields['notes'].insert('1.0', contact.notes or '')
             
             # Update history
             self.history_text.delete('1.0', tk.END)
@@ -258,6 +310,9 @@ class ContactManagerGUI:
                                        f"{action[1]} - {action[0]}\n{action[2]}\n{'='*40}\n")
 
     def new_contact(self):
+        self.current_contact_id = None
+        self.contact_list.select(None)
+        self.contact_tree.selection_remove(self.contact_tree.selection())
         # Clear all fields
         for field in self.fields.values():
             if isinstance(field, scrolledtext.ScrolledText):
@@ -268,7 +323,6 @@ class ContactManagerGUI:
 
     def save_contact(self):
         try:
-            selection = self.contact_tree.selection()
             data = {
                 'name': self.fields['name'].get(),
                 'company': self.fields['company'].get(),
@@ -279,27 +333,32 @@ class ContactManagerGUI:
                 'notes': self.fields['notes'].get('1.0', tk.END).strip()
             }
             
-            if selection:  # Update existing contact
-                contact_id = self.contact_tree.item(selection[0])['values'][0]
-                self.cm.update_contact(contact_id, **data)
+            if self.current_contact_id is not None:  # Update existing contact
+                # Only the fields that differ are written
+                if not self.cm.update_contact(self.current_contact_id, **data):
+                    messagebox.showinfo("Saved", "No changes to save.")
+                    return
             else:  # New contact
-                self.cm.add_contact(**data)
+                self.current_contact_id = self.cm.add_contact(**data)
+                self.contact_list.select(self.current_contact_id)
+                self.contact_list.render()
             
-            self.refresh_contacts()
             messagebox.showinfo("Success", "Contact saved successfully!")
             
         except ValueError as e:
             messagebox.showerror("Error", "Please ensure all fields are filled correctly.")
+        except LookupError:
+            messagebox.showerror("Error", "This contact no longer exists.")
 
     def delete_contact(self):
-        selection = self.contact_tree.selection()
-        if not selection:
+        if self.current_contact_id is None:
             return
         
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this contact?"):
-            contact_id = self.contact_tree.item(selection[0])['values'][0]
-            self.cm.delete_contact(contact_id)
-            self.refresh_contacts()
+            try:
+                self.cm.delete_contact(self.current_contact_id)
+            except LookupError:
+                messagebox.showerror("Error", "This contact no longer exists.")
             self.new_contact()  # Clear the form
 
     def create_custom_entry_style(self):
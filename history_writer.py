@@ -0,0 +1,106 @@
+import logging
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger('contact_manager.history')
+
+
+def history_timestamp():
+    """The current time in the same UTC format as SQLite's CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class HistoryWriter:
+    """Write-behind buffer for contact_history rows.
+
+    Entries are (contact_id, action_type, action_date, notes) tuples, stamped
+    when they are logged rather than when they are written. They are kept in
+    memory and inserted with one executemany per flush: from a background
+    thread every flush_interval seconds or as soon as batch_size entries are
+    waiting, on an explicit flush(), and on close(). Entries that fail to
+    write are kept and retried on the next flush.
+
+    history() merges entries that are still pending into the rows read from
+    the database, so readers see their own writes before they are flushed.
+    """
+
+    def __init__(self, pool, batch_size=500, flush_interval=1.0, on_flush=None):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self._pending = []
+        self._cond = threading.Condition()
+        # Held while a batch moves from memory to the database, so a reader
+        # never sees it in both places or in neither
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, entries):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("HistoryWriter is closed")
+            self._pending.extend(entries)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def history(self, contact_id, load):
+        """Rows from load() with this contact's pending entries in front,
+        newest first, matching get_contact_history's shape and order"""
+        with self._flush_lock:
+            with self._cond:
+                pending = [(action_type, action_date, notes)
+                           for entry_id, action_type, action_date, notes in self._pending
+                           if entry_id == contact_id]
+            rows = load()
+        pending.reverse()
+        return pending + list(rows)
+
+    def flush(self):
+        """Write every pending entry now; returns how many were written"""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with self.pool.transaction() as conn:
+                    conn.executemany('''
+                        INSERT INTO contact_history (contact_id, action_type, action_date, notes)
+                        VALUES (?, ?, ?, ?)
+                    ''', batch)
+            except BaseException:
+                with self._cond:
+                    self._pending[:0] = batch
+                raise
+            if self.on_flush is not None:
+                self.on_flush({entry[0] for entry in batch})
+        return len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("history flush failed; will retry")
+
+    def close(self):
+        """Stop the background thread and write whatever is still pending"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
@@ -0,0 +1,218 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger('contact_manager.queries')
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+def query_shape(sql):
+    """Collapse whitespace and literals so equivalent statements group together"""
+    return _LITERAL_RE.sub('?', _WHITESPACE_RE.sub(' ', sql).strip())
+
+
+class QueryStats:
+    """Thread-safe counters for every statement run through the pool.
+
+    Statements are grouped by shape. For each shape it keeps the call
+    count, total and maximum time (execute plus fetch), and rows returned.
+    Connection setup and COMMITs are also totalled separately. Statements
+    slower than slow_ms are logged to the 'contact_manager.queries' logger
+    and kept in a bounded list. With explain=True, the EXPLAIN QUERY PLAN
+    of each new SELECT/UPDATE/DELETE shape is captured the first time it runs.
+    """
+
+    def __init__(self, slow_ms=100.0, explain=False, max_slow=100):
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.started = datetime.now()
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._slow = deque(maxlen=max_slow)
+        self._connections = {'count': 0, 'total_ms': 0.0}
+        self._commits = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+
+    def _entry(self, shape):
+        entry = self._queries.get(shape)
+        if entry is None:
+            entry = self._queries[shape] = {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'plan': None}
+        return entry
+
+    def wants_plan(self, shape):
+        if not self.explain or not shape.upper().startswith(_EXPLAINABLE):
+            return False
+        with self._lock:
+            return self._entry(shape)['plan'] is None
+
+    def record_plan(self, shape, plan):
+        with self._lock:
+            self._entry(shape)['plan'] = plan
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self._connections['count'] += 1
+            self._connections['total_ms'] += seconds * 1000
+
+    def record_execute(self, shape, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._entry(shape)
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            if shape == 'COMMIT':
+                self._commits['count'] += 1
+                self._commits['total_ms'] += ms
+                self._commits['max_ms'] = max(self._commits['max_ms'], ms)
+        self._check_slow(shape, ms)
+
+    def record_fetch(self, shape, rows, seconds, statement_seconds):
+        """Add fetch time; statement_seconds is the statement's running total
+        (execute plus every fetch so far), used for max_ms"""
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._entry(shape)
+            entry['rows'] += rows
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], statement_seconds * 1000)
+        self._check_slow(shape, ms, phase='fetch')
+
+    def _check_slow(self, shape, ms, phase='execute'):
+        if ms < self.slow_ms:
+            return
+        logger.warning("slow query (%s %.1f ms): %s", phase, ms, shape)
+        with self._lock:
+            self._slow.append({
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'phase': phase,
+                'ms': ms,
+                'shape': shape,
+            })
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._slow.clear()
+            self._connections = {'count': 0, 'total_ms': 0.0}
+            self._commits = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            self.started = datetime.now()
+
+    def snapshot(self):
+        """Plain-dict copy of all counters, busiest shapes first"""
+        with self._lock:
+            queries = [
+                dict(entry, shape=shape,
+                     mean_ms=entry['total_ms'] / entry['count'] if entry['count'] else 0.0)
+                for shape, entry in self._queries.items()
+            ]
+            queries.sort(key=lambda entry: entry['total_ms'], reverse=True)
+            return {
+                'since': self.started.isoformat(timespec='seconds'),
+                'taken': datetime.now().isoformat(timespec='seconds'),
+                'slow_ms': self.slow_ms,
+                'connections': dict(self._connections),
+                'commits': dict(self._commits),
+                'queries': queries,
+                'slow_queries': list(self._slow),
+            }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+
+class InstrumentedCursor:
+    """sqlite3.Cursor proxy that times execution and counts fetched rows"""
+
+    def __init__(self, cursor, connection, stats):
+        self._cursor = cursor
+        self._connection = connection
+        self._stats = stats
+        self._shape = None
+        self._elapsed = 0.0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _explain(self, sql, parameters):
+        try:
+            plan = self._connection.execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+        except Exception as e:
+            plan = [(None, None, None, f"unavailable: {e}")]
+        self._stats.record_plan(self._shape, [row[3] for row in plan])
+
+    def execute(self, sql, parameters=()):
+        self._shape = query_shape(sql)
+        if self._stats.wants_plan(self._shape):
+            self._explain(sql, parameters)
+        start = time.perf_counter()
+        self._cursor.execute(sql, parameters)
+        self._elapsed = time.perf_counter() - start
+        self._stats.record_execute(self._shape, self._elapsed)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._shape = query_shape(sql)
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_parameters)
+        self._elapsed = time.perf_counter() - start
+        self._stats.record_execute(self._shape, self._elapsed)
+        return self
+
+    def _timed_fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        seconds = time.perf_counter() - start
+        self._elapsed += seconds
+        self._stats.record_fetch(self._shape, rows, seconds, self._elapsed)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed_fetch(self._cursor.fetchmany)
+        return self._timed_fetch(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+
+class InstrumentedConnection:
+    """sqlite3.Connection proxy whose cursors report to a QueryStats"""
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    @property
+    def raw(self):
+        return self._connection
+
+    def cursor(self):
+        return InstrumentedCursor(self._connection.cursor(), self._connection, self._stats)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,119 @@
+"""Versioned schema migrations tracked with PRAGMA user_version.
+
+Each entry in MIGRATIONS upgrades the schema by one version. Append new
+steps to the end; never edit or reorder steps that have shipped.
+"""
+import change_log
+import summary
+
+
+def create_tables(cursor):
+    """Version 1: the original contacts and contact_history tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            company TEXT,
+            role TEXT,
+            email TEXT,
+            linkedin_url TEXT,
+            relevance_score INTEGER CHECK (relevance_score BETWEEN 1 AND 10),
+            notes TEXT,
+            last_contact_date TEXT,
+            follow_up_date TEXT,
+            status TEXT DEFAULT 'New',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contact_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            contact_id INTEGER,
+            action_type TEXT,
+            action_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            FOREIGN KEY (contact_id) REFERENCES contacts (id)
+        )
+    ''')
+
+
+def add_query_indexes(cursor):
+    """Version 2: indexes matching the queries ContactManager runs"""
+    # get_contact_history: WHERE contact_id = ? ORDER BY action_date DESC
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_history_contact_date
+        ON contact_history (contact_id, action_date)
+    ''')
+    # Default listing order, walked by the index instead of sorting
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_relevance
+        ON contacts (relevance_score DESC, id)
+    ''')
+    # Contacts with a status, in follow-up date order
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_status
+        ON contacts (status, follow_up_date)
+    ''')
+
+
+def add_sort_indexes(cursor):
+    """Version 3: keyset pagination when the contact list is sorted by name
+    or company (the implicit rowid makes these (column, id) keys)"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts (name)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_company ON contacts (company)
+    ''')
+
+
+def add_follow_up_index(cursor):
+    """Version 4: the follow-up agenda, read in (follow_up_date, id) order.
+    Partial, since most contacts have no follow-up scheduled."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contacts_due
+        ON contacts (follow_up_date) WHERE follow_up_date IS NOT NULL
+    ''')
+
+
+def add_summary_tables(cursor):
+    """Version 5: dashboard counts maintained by triggers; see summary.py"""
+    summary.create_summary_tables(cursor)
+
+
+def add_change_log(cursor):
+    """Version 6: trigger-written change log for incremental sync; see
+    change_log.py"""
+    change_log.create_change_log(cursor)
+
+
+MIGRATIONS = [
+    create_tables,
+    add_query_indexes,
+    add_sort_indexes,
+    add_follow_up_index,
+    add_summary_tables,
+    add_change_log,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration in order and return the new version.
+
+    Must be called inside a write transaction so that concurrent processes
+    upgrading the same file serialize and the version bump is atomic with
+    the schema change. Databases newer than this code are left untouched.
+    """
+    version = get_version(conn)
+    cursor = conn.cursor()
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        MIGRATIONS[target - 1](cursor)
+        cursor.execute(f"PRAGMA user_version = {target}")
+    return max(version, SCHEMA_VERSION)
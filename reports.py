@@ -0,0 +1,200 @@
+"""Aggregate reports over contacts, fanned out across worker processes.
+
+A Report is an aggregate query over one range of contact ids plus a merge
+function that folds the per-range partial results into the final rows.
+run_report splits the id space into ranges and hands them to a pool of
+worker processes, each with its own read-only connection. Under WAL those
+readers never take a write lock, so the GUI, the CLI and other writers
+carry on while a report runs; a long report only holds back checkpoints.
+
+Each range is read in its own transaction, so a report that runs while
+other connections write can see some of those writes and not others. For
+a point-in-time result, run it against a copy made with
+ContactManager.backup.
+"""
+import os
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+import database
+
+# columns names the output columns; prepare(**options) turns the caller's
+# options into the query's named parameters (besides :low and :high), and
+# merge(partial_rows, params) builds the output rows
+Report = namedtuple('Report', ['columns', 'sql', 'prepare', 'merge'])
+
+ReportResult = namedtuple('ReportResult', ['columns', 'rows', 'ranges', 'elapsed'])
+
+# Id ranges per worker process; more ranges than workers keeps them all
+# busy when the ids are unevenly spread
+RANGES_PER_PROCESS = 4
+
+
+def _prepare_companies(top=None):
+    return {'top': top}
+
+
+def _merge_companies(rows, params):
+    totals = {}
+    for company, count, scored, score in rows:
+        total = totals.setdefault(company, [0, 0, 0])
+        total[0] += count
+        total[1] += scored
+        total[2] += score or 0
+    ranked = sorted(totals.items(), key=lambda item: (-item[1][0], item[0] or ''))
+    if params['top'] is not None:
+        ranked = ranked[:params['top']]
+    # Like AVG, the mean is over the contacts that have a score
+    return [(company, count, round(score / scored, 2) if scored else None)
+            for company, (count, scored, score) in ranked]
+
+
+def _prepare_relevance():
+    return {}
+
+
+def _merge_relevance(rows, params):
+    counts = {}
+    for score, count in rows:
+        counts[score] = counts.get(score, 0) + count
+    total = sum(counts.values())
+    return [(score, count, round(count / total, 4))
+            for score, count in sorted(counts.items(), key=lambda item: (item[0] is None, item[0]))]
+
+
+def _prepare_stale(days=90, today=None):
+    today = date.fromisoformat(today) if isinstance(today, str) else today or date.today()
+    return {'cutoff': (today - timedelta(days=days)).isoformat()}
+
+
+def _merge_stale(rows, params):
+    totals = {}
+    for status, stale, never, oldest in rows:
+        total = totals.setdefault(status, [0, 0, None])
+        total[0] += stale
+        total[1] += never
+        if oldest is not None and (total[2] is None or oldest < total[2]):
+            total[2] = oldest
+    return [(status, stale, never, oldest)
+            for status, (stale, never, oldest) in sorted(
+                totals.items(), key=lambda item: (-(item[1][0] + item[1][1]), item[0] or ''))]
+
+
+REPORTS = {
+    # Contacts and mean relevance per company, largest first
+    'companies': Report(
+        ('company', 'contacts', 'mean_relevance'),
+        '''
+            SELECT company, COUNT(*), COUNT(relevance_score), SUM(relevance_score)
+            FROM contacts
+            WHERE id BETWEEN :low AND :high
+            GROUP BY company
+        ''',
+        _prepare_companies, _merge_companies),
+    # How many contacts have each relevance score
+    'relevance': Report(
+        ('relevance_score', 'contacts', 'share'),
+        '''
+            SELECT relevance_score, COUNT(*) FROM contacts
+            WHERE id BETWEEN :low AND :high
+            GROUP BY relevance_score
+        ''',
+        _prepare_relevance, _merge_relevance),
+    # Per status, contacts last reached before the cutoff and contacts
+    # never reached at all
+    'stale': Report(
+        ('status', 'stale', 'never_contacted', 'oldest_contact'),
+        '''
+            SELECT status, COALESCE(SUM(last_contact_date < :cutoff), 0),
+                   SUM(last_contact_date IS NULL), MIN(last_contact_date)
+            FROM contacts
+            WHERE id BETWEEN :low AND :high
+              AND (last_contact_date IS NULL OR last_contact_date < :cutoff)
+            GROUP BY status
+        ''',
+        _prepare_stale, _merge_stale),
+}
+
+
+def id_ranges(conn, count):
+    """Split the contact ids into at most `count` (low, high) ranges of
+    equal width"""
+    low, high = conn.execute("SELECT MIN(id), MAX(id) FROM contacts").fetchone()
+    if low is None:
+        return []
+    width = -(-(high - low + 1) // max(count, 1))
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, width)]
+
+
+def _query_range(conn, report, params, id_range):
+    low, high = id_range
+    return conn.execute(report.sql, dict(params, low=low, high=high)).fetchall()
+
+
+def _open_reader(db_path):
+    conn = database.connect(db_path, read_only=True)
+    for pragma in database.READ_ONLY_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+# Set in each worker process by _open_worker
+_worker = None
+
+
+def _open_worker(db_path):
+    global _worker
+    _worker = _open_reader(db_path)
+
+
+def _run_range(name, params, id_range):
+    return _query_range(_worker, REPORTS[name], params, id_range)
+
+
+def run_report(db_path, name, processes=None, conn=None, **options):
+    """Run the report called `name` over the database at db_path and
+    return a ReportResult.
+
+    processes defaults to the number of CPUs. With one process, or when a
+    connection is passed in (an in-memory database can't be opened by
+    another process), the ranges are queried one after another here.
+    Other keyword arguments are the report's options, e.g. top for
+    'companies' or days for 'stale'.
+    """
+    report = REPORTS.get(name)
+    if report is None:
+        raise ValueError(f"Unknown report {name!r}; expected one of {', '.join(REPORTS)}")
+    params = report.prepare(**options)
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    own_conn = conn is None
+    if own_conn:
+        conn = _open_reader(db_path)
+    try:
+        ranges = id_ranges(conn, processes * RANGES_PER_PROCESS)
+        if processes == 1 or not own_conn or len(ranges) <= 1:
+            parts = [_query_range(conn, report, params, id_range) for id_range in ranges]
+        else:
+            parts = _fan_out(db_path, name, params, ranges, processes)
+    finally:
+        if own_conn:
+            conn.close()
+
+    rows = report.merge([row for part in parts for row in part], params)
+    return ReportResult(report.columns, rows, len(ranges), time.perf_counter() - start)
+
+
+def _fan_out(db_path, name, params, ranges, processes):
+    # Imported here so single-process reports don't pay for it. Workers are
+    # spawned rather than forked: the parent may be running Tk or the
+    # history writer thread.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(ranges)),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_open_worker, initargs=(db_path,)) as pool:
+        return list(pool.map(_run_range, [name] * len(ranges), [params] * len(ranges),
+                             ranges))
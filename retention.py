@@ -0,0 +1,223 @@
+"""Retention and compaction for contact_history.
+
+A RetentionPolicy says which history rows to drop:
+  * history of contacts that no longer exist (orphans),
+  * rows older than max_age_days,
+  * all but the last row of each run of consecutive "Updated" rows, whose
+    field lists are merged into the row that is kept,
+  * all but the newest max_per_contact rows of each contact.
+
+compact_history walks contact_history a few hundred contacts at a time,
+each batch in its own short transaction, so the GUI and other writers are
+only ever held up for one batch. Dropped rows can be copied to a separate
+archive database first. Afterwards the freed pages are returned to the
+filesystem with incremental VACUUM.
+"""
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+RetentionPolicy = namedtuple(
+    'RetentionPolicy',
+    ['max_age_days', 'max_per_contact', 'collapse_updates', 'drop_orphans'],
+    defaults=[None, None, False, True])
+
+UPDATE_PREFIX = "Updated fields: "
+
+# freelist pages released per incremental_vacuum step
+VACUUM_STEP = 1000
+
+
+def _merge_update_notes(notes):
+    """Union the field lists of a run of "Updated fields: ..." notes"""
+    fields = []
+    for note in notes:
+        if not note or not note.startswith(UPDATE_PREFIX):
+            return notes[-1]
+        for field in note[len(UPDATE_PREFIX):].split(', '):
+            if field and field not in fields:
+                fields.append(field)
+    return UPDATE_PREFIX + ', '.join(fields)
+
+
+def _attach_archive(conn, archive_path):
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive.contact_history (
+            id INTEGER PRIMARY KEY,
+            contact_id INTEGER,
+            action_type TEXT,
+            action_date TEXT,
+            notes TEXT,
+            archived_at TEXT,
+            reason TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_contact
+        ON contact_history (contact_id, action_date)
+    ''')
+
+
+def _select_collapsed(conn, low, high):
+    """Mark all but the last of each run of consecutive Updated rows and
+    rewrite the kept row's notes; returns how many rows were marked"""
+    rows = conn.execute('''
+        SELECT id, contact_id, action_type, notes FROM contact_history
+        WHERE contact_id > ? AND contact_id <= ?
+          AND id NOT IN (SELECT id FROM temp.retention_ids)
+        ORDER BY contact_id, action_date, id
+    ''', (low, high)).fetchall()
+
+    dropped = []
+    rewritten = []
+    run = []
+
+    def close_run():
+        if len(run) > 1:
+            dropped.extend((row[0],) for row in run[:-1])
+            rewritten.append((_merge_update_notes([row[3] for row in run]), run[-1][0]))
+        run.clear()
+
+    for row in rows:
+        if run and row[1] != run[-1][1]:
+            close_run()
+        if row[2] == 'Updated':
+            run.append(row)
+        else:
+            close_run()
+    close_run()
+
+    conn.executemany("INSERT INTO temp.retention_ids (id, reason) VALUES (?, 'collapsed')",
+                     dropped)
+    conn.executemany("UPDATE contact_history SET notes = ? WHERE id = ?", rewritten)
+    return len(dropped)
+
+
+def _compact_batch(conn, policy, low, high, cutoff, archived_at, archive):
+    counts = {}
+    conn.execute("DELETE FROM temp.retention_ids")
+    if policy.drop_orphans:
+        counts['orphans'] = conn.execute('''
+            INSERT INTO temp.retention_ids (id, reason)
+            SELECT h.id, 'orphan' FROM contact_history h
+            WHERE h.contact_id > ? AND h.contact_id <= ?
+              AND NOT EXISTS (SELECT 1 FROM contacts c WHERE c.id = h.contact_id)
+        ''', (low, high)).rowcount
+    if cutoff is not None:
+        counts['expired'] = conn.execute('''
+            INSERT OR IGNORE INTO temp.retention_ids (id, reason)
+            SELECT id, 'expired' FROM contact_history
+            WHERE contact_id > ? AND contact_id <= ? AND action_date < ?
+        ''', (low, high, cutoff)).rowcount
+    if policy.collapse_updates:
+        counts['collapsed'] = _select_collapsed(conn, low, high)
+    if policy.max_per_contact is not None:
+        counts['capped'] = conn.execute('''
+            INSERT INTO temp.retention_ids (id, reason)
+            SELECT id, 'capped' FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY contact_id ORDER BY action_date DESC, id DESC) AS position
+                FROM contact_history
+                WHERE contact_id > ? AND contact_id <= ?
+                  AND id NOT IN (SELECT id FROM temp.retention_ids)
+            ) WHERE position > ?
+        ''', (low, high, policy.max_per_contact)).rowcount
+
+    if archive:
+        counts['archived'] = conn.execute('''
+            INSERT OR REPLACE INTO archive.contact_history
+            SELECT h.id, h.contact_id, h.action_type, h.action_date, h.notes, ?, r.reason
+            FROM contact_history h JOIN temp.retention_ids r ON r.id = h.id
+        ''', (archived_at,)).rowcount
+    conn.execute("DELETE FROM contact_history WHERE id IN (SELECT id FROM temp.retention_ids)")
+    return counts
+
+
+def incremental_vacuum(conn, max_pages=None):
+    """Release free pages in small steps; returns the number released.
+    Does nothing unless the database uses auto_vacuum=INCREMENTAL."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return 0
+    released = 0
+    while max_pages is None or released < max_pages:
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not free:
+            break
+        step = min(free, VACUUM_STEP)
+        conn.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+        released += step
+    return released
+
+
+def enable_incremental_vacuum(conn):
+    """One-off conversion of an existing database to auto_vacuum=INCREMENTAL.
+    This runs a full VACUUM, which rewrites the file and blocks writers for
+    its duration; databases created by this version start out incremental."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def compact_history(cm, policy, archive_path=None, batch_size=200, pause=0.0, vacuum=True):
+    """Apply `policy` to contact_history in batches of batch_size contacts.
+
+    Each batch commits on its own; `pause` seconds are slept between batches
+    to leave the write lock free for interactive use. With archive_path,
+    every dropped row is copied (with the reason it was dropped) into that
+    SQLite file in the same transaction that deletes it. Returns a dict of
+    counts per reason plus archived, batches, pages_freed and elapsed.
+    """
+    if cm.pool.in_transaction():
+        raise sqlite3.ProgrammingError("compact_history can't run inside a transaction")
+    start = time.perf_counter()
+    cm.flush_history()
+
+    now = datetime.now(timezone.utc)
+    cutoff = None
+    if policy.max_age_days is not None:
+        cutoff = (now - timedelta(days=policy.max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+    archived_at = now.strftime('%Y-%m-%d %H:%M:%S')
+
+    totals = {'orphans': 0, 'expired': 0, 'collapsed': 0, 'capped': 0,
+              'archived': 0, 'batches': 0}
+    conn = cm.pool.get()
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS retention_ids "
+                 "(id INTEGER PRIMARY KEY, reason TEXT)")
+    if archive_path:
+        _attach_archive(conn, archive_path)
+    try:
+        low = -1
+        while True:
+            # The contact_id that ends this batch, found through the
+            # (contact_id, action_date) index
+            row = conn.execute('''
+                SELECT MAX(contact_id) FROM (
+                    SELECT DISTINCT contact_id FROM contact_history
+                    WHERE contact_id > ? ORDER BY contact_id LIMIT ?
+                )
+            ''', (low, batch_size)).fetchone()
+            high = row[0]
+            if high is None:
+                break
+            with cm.transaction() as conn:
+                counts = _compact_batch(conn, policy, low, high, cutoff, archived_at,
+                                        bool(archive_path))
+            for reason, count in counts.items():
+                totals[reason] += count
+            totals['batches'] += 1
+            cm.history_cache.clear()
+            low = high
+            if pause:
+                time.sleep(pause)
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.retention_ids")
+        if archive_path:
+            conn.execute("DETACH DATABASE archive")
+
+    totals['pages_freed'] = incremental_vacuum(conn) if vacuum else 0
+    totals['elapsed'] = time.perf_counter() - start
+    return totals
@@ -0,0 +1,114 @@
+import re
+import sqlite3
+import unicodedata
+
+# Columns indexed for full-text search, with their bm25 weights
+FTS_COLUMNS = (
+    ('name', 10.0),
+    ('company', 5.0),
+    ('role', 3.0),
+    ('email', 3.0),
+    ('notes', 1.0),
+)
+
+_COLUMN_LIST = ', '.join(column for column, _ in FTS_COLUMNS)
+_NEW_VALUES = ', '.join(f"new.{column}" for column, _ in FTS_COLUMNS)
+_OLD_VALUES = ', '.join(f"old.{column}" for column, _ in FTS_COLUMNS)
+BM25_WEIGHTS = ', '.join(str(weight) for _, weight in FTS_COLUMNS)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts5_available(conn):
+    """Whether this SQLite build was compiled with the FTS5 extension"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def fts_index_exists(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'contacts_fts'")
+    return cursor.fetchone() is not None
+
+
+def create_fts_index(cursor):
+    """Create the external-content FTS5 index over contacts plus the
+    triggers that keep it in sync, and backfill it from existing rows."""
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE contacts_fts USING fts5(
+            {_COLUMN_LIST},
+            content='contacts',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts (rowid, {_COLUMN_LIST})
+            VALUES (new.id, {_NEW_VALUES});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER contacts_fts_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, {_COLUMN_LIST})
+            VALUES ('delete', old.id, {_OLD_VALUES});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER contacts_fts_update AFTER UPDATE OF {_COLUMN_LIST} ON contacts BEGIN
+            INSERT INTO contacts_fts (contacts_fts, rowid, {_COLUMN_LIST})
+            VALUES ('delete', old.id, {_OLD_VALUES});
+            INSERT INTO contacts_fts (rowid, {_COLUMN_LIST})
+            VALUES (new.id, {_NEW_VALUES});
+        END
+    ''')
+
+    cursor.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
+
+
+def build_match_query(search_term):
+    """Turn free text into an FTS5 query that prefix-matches every word.
+
+    Returns None when the term has no indexable words, in which case the
+    caller should fall back to a LIKE scan.
+    """
+    tokens = _TOKEN_RE.findall(search_term)
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def fold_text(text):
+    """Approximate the unicode61 tokenizer: casefold and strip diacritics"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def make_matcher(search_term, columns, fts=True):
+    """Build a predicate over row tuples (laid out as `columns`) that mirrors
+    what search would match in the database, so an already fetched result
+    set can be narrowed in memory. Returns None if the term can't be
+    mirrored."""
+    if fts:
+        tokens = [fold_text(token) for token in _TOKEN_RE.findall(search_term)]
+        if not tokens:
+            return None
+        positions = [columns.index(column) for column, _ in FTS_COLUMNS]
+
+        def matches(row):
+            words = _TOKEN_RE.findall(fold_text(' '.join(row[i] for i in positions if row[i])))
+            return all(any(word.startswith(token) for word in words) for token in tokens)
+    else:
+        # Mirrors the LIKE fallback: a case-insensitive substring of
+        # name, company or notes
+        needle = search_term.casefold()
+        positions = [columns.index(column) for column in ('name', 'company', 'notes')]
+
+        def matches(row):
+            return any(needle in row[i].casefold() for i in positions if row[i])
+    return matches
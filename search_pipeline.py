@@ -0,0 +1,179 @@
+import queue
+import sqlite3
+import threading
+
+import search_index
+
+# Extra columns fetched with search results so they can be narrowed in memory
+NARROW_COLUMNS = ('role', 'email', 'notes')
+
+
+class SearchPipeline:
+    """Debounced search for the GUI that queries off the Tk main thread.
+
+    Each keystroke restarts a short timer; when it fires, the term is handed
+    to a worker thread with its own pooled connection. A newer term
+    interrupts any query still running for an older one, and results that
+    arrive for a superseded term are dropped. Results are applied to the
+    VirtualContactList from the main thread by polling with root.after.
+
+    When a term extends the previous one and that result set was small
+    enough to hold in memory, the worker narrows it with the same matching
+    rules as the database instead of running another query.
+    """
+
+    DELAY_MS = 200
+    POLL_MS = 20
+
+    def __init__(self, root, cm, contact_list, narrow_limit=5000):
+        self.root = root
+        self.cm = cm
+        self.contact_list = contact_list
+        self.narrow_limit = narrow_limit
+        self.columns = tuple(contact_list.columns) + NARROW_COLUMNS
+
+        self._generation = 0
+        self._timer = None
+        self._polling = False
+        self._results = queue.Queue()
+
+        # Worker state, guarded by _cond
+        self._cond = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._stopping = False
+        self._conn = None
+        # Last complete result set, as (term, rows), and how many times the
+        # data has changed; a result read before a change isn't kept
+        self._complete = None
+        self._data_generation = 0
+
+        self._worker = threading.Thread(target=self._run, name="search-worker", daemon=True)
+        self._worker.start()
+
+    # -- main thread --------------------------------------------------------
+
+    def submit(self, term):
+        """Schedule a search for `term`, replacing any pending keystroke"""
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = self.root.after(self.DELAY_MS, self._fire, term)
+
+    def _fire(self, term):
+        self._timer = None
+        self._generation += 1
+        request = (self._generation, term.strip(),
+                   self.contact_list.sort_column, self.contact_list.descending)
+        with self._cond:
+            self._pending = request
+            if self._busy and self._conn is not None:
+                self._conn.interrupt()
+            self._cond.notify()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        done = False
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation:
+                continue  # superseded while in flight
+            done = True
+            if result is not None:
+                self._apply(result)
+
+        if done:
+            self._polling = False
+        else:
+            self.root.after(self.POLL_MS, self._poll)
+
+    def _apply(self, result):
+        kind, term, rows, next_cursor, total = result
+        width = len(self.contact_list.columns)
+        rows = [row[:width] for row in rows]
+        if kind == 'rows':
+            self.contact_list.show_rows(term, rows)
+        else:
+            self.contact_list.show_page(term, rows, next_cursor, total)
+
+    def invalidate(self):
+        """Forget the cached result set after the data has changed"""
+        with self._cond:
+            self._data_generation += 1
+            self._complete = None
+
+    def close(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        with self._cond:
+            self._stopping = True
+            if self._busy and self._conn is not None:
+                self._conn.interrupt()
+            self._cond.notify()
+        self._worker.join(timeout=1)
+
+    # -- worker thread ------------------------------------------------------
+
+    def _run(self):
+        self._conn = self.cm.pool.get()
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                generation, term, order_by, descending = self._pending
+                self._pending = None
+                self._busy = True
+
+            try:
+                result = self._search(term, order_by, descending)
+            except sqlite3.OperationalError as e:
+                if 'interrupt' in str(e):
+                    continue  # a newer term is already pending
+                result = None
+            except sqlite3.Error:
+                result = None
+            finally:
+                with self._cond:
+                    self._busy = False
+            self._results.put((generation, result))
+
+    def _remember(self, complete, data_generation):
+        with self._cond:
+            if data_generation == self._data_generation:
+                self._complete = complete
+
+    def _search(self, term, order_by, descending):
+        with self._cond:
+            previous = self._complete
+            data_generation = self._data_generation
+        if term and previous and term.startswith(previous[0]):
+            matches = search_index.make_matcher(term, self.columns, self.cm.fts_enabled)
+            if matches is not None:
+                rows = [row for row in previous[1] if matches(row)]
+                self._remember((term, rows), data_generation)
+                return ('rows', term, rows, None, len(rows))
+
+        if not term:
+            page = self.cm.get_contacts_page(self.contact_list.PAGE_SIZE,
+                                             columns=self.contact_list.columns,
+                                             order_by=order_by, descending=descending)
+            self._remember(None, data_generation)
+            return ('paged', None, page.rows, page.next_cursor, self.cm.count_contacts())
+
+        page = self.cm.get_contacts_page(self.narrow_limit, columns=self.columns,
+                                         search=term, order_by=order_by,
+                                         descending=descending)
+        if page.next_cursor is None:
+            self._remember((term, page.rows), data_generation)
+            return ('rows', term, page.rows, None, len(page.rows))
+
+        self._remember(None, data_generation)
+        total = self.cm.count_contacts(search=term)
+        return ('paged', term, page.rows, page.next_cursor, total)
@@ -0,0 +1,166 @@
+"""Materialized dashboard counts, kept current by triggers on contacts.
+
+contact_summary holds one row per (dimension, value) with the number of
+contacts that have that value: per status, per company, per relevance
+score and per follow-up day. Triggers adjust the affected rows on every
+insert, delete and relevant update, in the writer's own transaction, so
+the counts are exact for any write path (ContactManager, bulk import,
+another process) and reading them costs a lookup instead of a scan of
+contacts.
+
+Overdue and due-today follow-ups depend on the date, so they are summed
+over the per-day rows when read; that is one row per scheduled day, not
+per contact.
+"""
+from collections import namedtuple
+
+# dimension -> expression over a contacts row (`{row}` is new, old or the
+# table itself). Rows where it is NULL are not counted in that dimension.
+DIMENSIONS = {
+    'status': "COALESCE({row}.status, '')",
+    'company': "COALESCE({row}.company, '')",
+    'relevance': "{row}.relevance_score",
+    'follow_up': "substr({row}.follow_up_date, 1, 10)",
+}
+
+# The contacts column each dimension is derived from
+DIMENSION_COLUMNS = {
+    'status': 'status',
+    'company': 'company',
+    'relevance': 'relevance_score',
+    'follow_up': 'follow_up_date',
+}
+
+# (label, lowest score, highest score) of the relevance buckets
+RELEVANCE_BUCKETS = (
+    ('1-3', 1, 3),
+    ('4-6', 4, 6),
+    ('7-8', 7, 8),
+    ('9-10', 9, 10),
+)
+
+# total contacts; {status: count}; [(company, count)] largest first;
+# {bucket label: count}; follow-ups due before today, today and later
+Summary = namedtuple('Summary', ['total', 'by_status', 'top_companies', 'by_relevance',
+                                 'overdue', 'due_today', 'upcoming'])
+
+
+def _increment(dimension, row):
+    expr = DIMENSIONS[dimension].format(row=row)
+    return f'''
+            INSERT INTO contact_summary (dimension, value, contacts)
+            SELECT '{dimension}', {expr}, 1 WHERE {expr} IS NOT NULL
+            ON CONFLICT (dimension, value) DO UPDATE SET contacts = contacts + 1;'''
+
+
+def _decrement(dimension, row):
+    expr = DIMENSIONS[dimension].format(row=row)
+    return f'''
+            UPDATE contact_summary SET contacts = contacts - 1
+            WHERE dimension = '{dimension}' AND value = {expr};
+            DELETE FROM contact_summary
+            WHERE dimension = '{dimension}' AND value = {expr} AND contacts <= 0;'''
+
+
+def create_summary_tables(cursor):
+    """Create contact_summary and its triggers, and fill it from contacts"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contact_summary (
+            dimension TEXT NOT NULL,
+            value NOT NULL,
+            contacts INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    # Largest companies first without sorting every company
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_summary_contacts
+        ON contact_summary (dimension, contacts)
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS contacts_summary_insert AFTER INSERT ON contacts BEGIN
+            {''.join(_increment(dimension, 'new') for dimension in DIMENSIONS)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS contacts_summary_delete AFTER DELETE ON contacts BEGIN
+            {''.join(_decrement(dimension, 'old') for dimension in DIMENSIONS)}
+        END
+    ''')
+    for dimension, column in DIMENSION_COLUMNS.items():
+        old, new = (DIMENSIONS[dimension].format(row=row) for row in ('old', 'new'))
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS contacts_summary_update_{dimension}
+            AFTER UPDATE OF {column} ON contacts
+            WHEN {old} IS NOT {new} BEGIN
+                {_decrement(dimension, 'old')}
+                {_increment(dimension, 'new')}
+            END
+        ''')
+
+    rebuild_summary(cursor)
+
+
+def _computed_rows():
+    """SELECT of every (dimension, value, contacts) row, counted from
+    contacts"""
+    return ' UNION ALL '.join(
+        f'''SELECT '{dimension}', {expr.format(row='contacts')}, COUNT(*) FROM contacts
+            WHERE {expr.format(row='contacts')} IS NOT NULL GROUP BY 2'''
+        for dimension, expr in DIMENSIONS.items())
+
+
+def rebuild_summary(cursor):
+    """Recount contact_summary from scratch; returns the rows written"""
+    cursor.execute("DELETE FROM contact_summary")
+    cursor.execute(f"INSERT INTO contact_summary (dimension, value, contacts) {_computed_rows()}")
+    return cursor.rowcount
+
+
+def check_summary(cursor):
+    """[(dimension, value, stored, actual)] for every count that disagrees
+    with a fresh count of contacts; empty when the summary is consistent"""
+    cursor.execute(f'''
+        WITH actual (dimension, value, contacts) AS ({_computed_rows()})
+        SELECT actual.dimension, actual.value, stored.contacts, actual.contacts
+        FROM actual LEFT JOIN contact_summary AS stored
+             ON stored.dimension = actual.dimension AND stored.value = actual.value
+        WHERE stored.contacts IS NOT actual.contacts
+        UNION ALL
+        SELECT stored.dimension, stored.value, stored.contacts, 0
+        FROM contact_summary AS stored
+        WHERE NOT EXISTS (SELECT 1 FROM actual
+                          WHERE actual.dimension = stored.dimension
+                            AND actual.value = stored.value)
+    ''')
+    return cursor.fetchall()
+
+
+def read_summary(conn, today, top=10):
+    """Build a Summary from contact_summary; `today` is an ISO date"""
+    rows = conn.execute('''
+        SELECT dimension, value, contacts FROM contact_summary
+        WHERE dimension IN ('status', 'relevance')
+    ''').fetchall()
+    by_status = {value: count for dimension, value, count in rows if dimension == 'status'}
+    scores = {value: count for dimension, value, count in rows if dimension == 'relevance'}
+    by_relevance = {label: sum(count for score, count in scores.items() if low <= score <= high)
+                    for label, low, high in RELEVANCE_BUCKETS}
+
+    top_companies = conn.execute('''
+        SELECT value, contacts FROM contact_summary
+        WHERE dimension = 'company'
+        ORDER BY contacts DESC, value
+        LIMIT ?
+    ''', (top,)).fetchall()
+
+    overdue, due_today, upcoming = conn.execute('''
+        SELECT COALESCE(SUM(contacts) FILTER (WHERE value < :today), 0),
+               COALESCE(SUM(contacts) FILTER (WHERE value = :today), 0),
+               COALESCE(SUM(contacts) FILTER (WHERE value > :today), 0)
+        FROM contact_summary WHERE dimension = 'follow_up'
+    ''', {'today': today}).fetchone()
+
+    return Summary(sum(by_status.values()), by_status, top_companies, by_relevance,
+                   overdue, due_today, upcoming)
@@ -0,0 +1,59 @@
+import tkinter as tk
+from tkinter import ttk
+
+from summary import RELEVANCE_BUCKETS
+
+
+class SummaryStrip:
+    """Header of dashboard counts: contacts by status, follow-ups overdue
+    and due today, and the relevance buckets.
+
+    Everything comes from get_summary, which reads the precomputed summary
+    table, so refreshing after every change costs the same at any size.
+    Refreshes are coalesced to one per idle period, and a timer picks up
+    other processes' writes and the date rolling over.
+    """
+
+    REFRESH_MS = 60000
+
+    def __init__(self, parent, root, cm, colors):
+        self.root = root
+        self.cm = cm
+        self.pending = None
+        self.timer = None
+
+        self.frame = ttk.Frame(parent)
+        self.total_label = ttk.Label(self.frame, text="")
+        self.total_label.pack(side=tk.LEFT, padx=(5, 15))
+        self.status_label = ttk.Label(self.frame, text="")
+        self.status_label.pack(side=tk.LEFT, padx=(0, 15))
+        self.relevance_label = ttk.Label(self.frame, text="")
+        self.relevance_label.pack(side=tk.LEFT, padx=(0, 15))
+        self.due_label = ttk.Label(self.frame, text="", foreground=colors['warning'])
+        self.due_label.pack(side=tk.RIGHT, padx=5)
+
+    def refresh(self):
+        self.pending = None
+        counts = self.cm.get_summary()
+        self.total_label.configure(text=f"{counts.total} contacts")
+        self.status_label.configure(text="  ".join(
+            f"{status or '(none)'} {count}" for status, count in sorted(counts.by_status.items())))
+        self.relevance_label.configure(text="Relevance " + "  ".join(
+            f"{label}: {counts.by_relevance[label]}" for label, _, _ in RELEVANCE_BUCKETS))
+        self.due_label.configure(text=f"{counts.overdue} overdue, {counts.due_today} due today")
+        self.timer = self.root.after(self.REFRESH_MS, self.schedule)
+
+    def schedule(self):
+        """Refresh once the GUI is idle, however often this is called"""
+        if self.pending is None:
+            if self.timer is not None:
+                self.root.after_cancel(self.timer)
+            self.pending = self.root.after_idle(self.refresh)
+
+    def apply_changes(self, events):
+        self.schedule()
+
+    def close(self):
+        for callback in (self.pending, self.timer):
+            if callback is not None:
+                self.root.after_cancel(callback)
@@ -0,0 +1,88 @@
+"""AsyncContactManager under hundreds of concurrent coroutines."""
+import asyncio
+import sqlite3
+
+import pytest
+
+from async_manager import AsyncContactManager
+
+COROUTINES = 300
+
+
+def run(path, scenario, **options):
+    async def main():
+        async with AsyncContactManager(str(path), **options) as acm:
+            return await scenario(acm)
+    return asyncio.run(main())
+
+
+def test_writes_are_visible_to_the_writer(tmp_path):
+    async def client(acm, n):
+        contact_id = await acm.add_contact(f"Async {n}", "Acme", "Engineer")
+        contact = await acm.get_contact(contact_id)
+        assert contact is not None and contact.name == f"Async {n}"
+        for score in (3, 7):
+            await acm.update_contact(contact_id, relevance_score=score)
+            assert (await acm.get_contact(contact_id)).relevance_score == score
+        return contact_id
+
+    async def scenario(acm):
+        ids = await asyncio.gather(*(client(acm, n) for n in range(COROUTINES)))
+        assert len(set(ids)) == COROUTINES
+        assert await acm.count_contacts(search="Async") == COROUTINES
+        history = await acm.get_contact_history(ids[0])
+        assert [entry[0] for entry in history] == ["Updated", "Updated", "Created"]
+        return acm.group_commit_stats()
+
+    stats = run(tmp_path / "contacts.db", scenario)
+    # Writes queued behind a running commit share the next one
+    assert stats['writes'] == 3 * COROUTINES
+    assert stats['batches'] < stats['writes']
+
+
+def test_failing_write_only_undoes_itself(tmp_path):
+    async def scenario(acm):
+        contact_id = await acm.add_contact("Ada", "Acme", "Engineer", relevance_score=5)
+
+        def rename_then_fail(cm):
+            cm.update_contact(contact_id, name="Half done")
+            cm.update_contact(contact_id, relevance_score=99)
+
+        outcomes = await asyncio.gather(
+            acm.run_write(rename_then_fail, acm.cm),
+            *(acm.add_contact(f"Survivor {n}", "Acme", "Engineer")
+              for n in range(COROUTINES)),
+            return_exceptions=True)
+
+        assert isinstance(outcomes[0], sqlite3.IntegrityError)
+        assert all(isinstance(contact_id, int) for contact_id in outcomes[1:])
+        contact = await acm.get_contact(contact_id)
+        assert (contact.name, contact.relevance_score) == ("Ada", 5)
+        assert await acm.count_contacts(search="Survivor") == COROUTINES
+
+        with pytest.raises(LookupError):
+            await acm.update_contact(10 ** 6, name="Nobody")
+
+    run(tmp_path / "contacts.db", scenario)
+
+
+def test_change_events_cover_every_write(tmp_path):
+    async def scenario(acm):
+        events = []
+        acm.subscribe(events.extend)
+        ids = await asyncio.gather(*(acm.add_contact(f"Async {n}", "Acme", "Engineer")
+                                     for n in range(COROUTINES)))
+        await asyncio.gather(*(acm.update_contact(contact_id, status="Contacted")
+                               for contact_id in ids[::2]))
+        await asyncio.gather(*(acm.delete_contact(contact_id) for contact_id in ids[1::2]))
+        # Listeners are called through the loop after each commit
+        await asyncio.sleep(0)
+
+        changed = {}
+        for event in events:
+            changed.setdefault(event.kind, []).extend(event.ids)
+        assert sorted(changed['inserted']) == sorted(ids)
+        assert sorted(changed['updated']) == sorted(ids[::2])
+        assert sorted(changed['deleted']) == sorted(ids[1::2])
+
+    run(tmp_path / "contacts.db", scenario)
@@ -0,0 +1,310 @@
+import tkinter as tk
+from tkinter import ttk
+
+from contact_manager import CONTACT_COLUMNS
+import search_index
+
+
+class VirtualContactList:
+    """Windowed view of the contact table in a ttk.Treeview.
+
+    Only the rows that fit in the widget, plus a small buffer, exist as Tk
+    items. Rows are fetched from the database a keyset page at a time as
+    the view scrolls further than anything loaded so far, and the external
+    scrollbar is driven from the total row count rather than the items.
+    The selection is tracked by contact id, so it survives scrolling and
+    re-sorting.
+    """
+
+    PAGE_SIZE = 500
+    BUFFER = 2
+    MAX_PATCHED_ROWS = 100
+
+    def __init__(self, tree, scrollbar, cm, columns, headings):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.cm = cm
+        self.columns = columns
+        self.headings = dict(zip(columns, headings))
+        self.tree_columns = dict(zip(columns, tree['columns']))
+
+        self.sort_column = 'relevance_score'
+        self.descending = True
+        self.search = None
+        self.selected_id = None
+        self.offset = 0
+        self.visible_rows = 20
+        self.row_height = 30
+
+        self.rows = []
+        self.positions = {}
+        self.next_cursor = None
+        self.exhausted = False
+        self.total = 0
+
+        scrollbar.configure(command=self.on_scrollbar)
+        tree.bind('<Configure>', self.on_resize)
+        tree.bind('<MouseWheel>', self.on_mousewheel)
+        tree.bind('<Button-4>', self.on_mousewheel)
+        tree.bind('<Button-5>', self.on_mousewheel)
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            tree.bind(key, self.on_key)
+        for column in columns:
+            tree.heading(self.tree_columns[column],
+                         command=lambda c=column: self.sort_by(c))
+        self._update_headings()
+
+    # -- data ---------------------------------------------------------------
+
+    def reload(self, keep_position=True):
+        """Forget loaded rows and refetch only what the window needs"""
+        self.rows = []
+        self.positions = {}
+        self.next_cursor = None
+        self.exhausted = False
+        self.total = self.cm.count_contacts(search=self.search)
+        if not keep_position:
+            self.offset = 0
+        self.render()
+
+    def _set_rows(self, rows, next_cursor):
+        self.rows = list(rows)
+        self.positions = {row[0]: index for index, row in enumerate(self.rows)}
+        self.next_cursor = next_cursor
+        self.exhausted = next_cursor is None
+
+    def show_rows(self, search, rows):
+        """Display a complete result set computed elsewhere"""
+        self.search = search
+        self._set_rows(rows, None)
+        self.total = len(self.rows)
+        self._sort_loaded()
+        self.offset = 0
+        self.render()
+
+    def show_page(self, search, rows, next_cursor, total):
+        """Display the first page of a result set; later pages load on scroll"""
+        self.search = search
+        self._set_rows(rows, next_cursor)
+        self.total = total
+        self.offset = 0
+        self.render()
+
+    def _sort_loaded(self):
+        """Sort the loaded rows in place the same way the database would:
+        NULLs lowest, ties broken by ascending id"""
+        index = self.columns.index(self.sort_column)
+        self.rows.sort(key=lambda row: row[0])
+        self.rows.sort(key=lambda row: (row[index] is not None, row[index]),
+                       reverse=self.descending)
+        self.positions = {row[0]: i for i, row in enumerate(self.rows)}
+
+    def _sort_key(self, row):
+        value = row[self.columns.index(self.sort_column)]
+        return (value is not None, value)
+
+    def _precedes(self, a, b):
+        """Whether row a sorts before row b in the current order"""
+        key_a, key_b = self._sort_key(a), self._sort_key(b)
+        if key_a != key_b:
+            return key_a > key_b if self.descending else key_a < key_b
+        return a[0] < b[0]
+
+    def _insertion_point(self, row):
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            if self._precedes(self.rows[middle], row):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _matches_search(self, contact):
+        if not self.search:
+            return True
+        matches = search_index.make_matcher(self.search, CONTACT_COLUMNS, self.cm.fts_enabled)
+        if matches is None:
+            matches = search_index.make_matcher(self.search, CONTACT_COLUMNS, fts=False)
+        return matches(contact)
+
+    def apply_changes(self, events):
+        """Patch the loaded rows for ChangeEvents from ContactManager and
+        redraw the window, instead of reloading the list.
+
+        Changed rows are re-read by primary key and placed by binary search.
+        A row that now sorts past everything loaded so far is left for the
+        next page fetch to pick up. Large batches (bulk imports) just reload.
+        """
+        if sum(len(event.ids) for event in events) > self.MAX_PATCHED_ROWS:
+            self.reload()
+            return
+
+        for event in events:
+            for contact_id in event.ids:
+                index = self.positions.get(contact_id)
+                if index is not None:
+                    del self.rows[index]
+                    self._reindex(index)
+                if event.kind == 'inserted':
+                    self.total += 1
+                elif event.kind == 'deleted':
+                    self.total -= 1
+                    continue
+
+                contact = self.cm.get_contact(contact_id)
+                if contact is None or not self._matches_search(contact):
+                    continue
+                row = tuple(getattr(contact, column) for column in self.columns)
+                position = self._insertion_point(row)
+                if position < len(self.rows) or self.exhausted:
+                    self.rows.insert(position, row)
+                    self._reindex(position)
+
+        if self.search:
+            # Edits can move rows in or out of the search results
+            self.total = self.cm.count_contacts(search=self.search)
+        self.render()
+
+    def _reindex(self, start):
+        """Refresh positions from `start` on after an insert or delete"""
+        for contact_id in [contact_id for contact_id, index in self.positions.items()
+                           if index >= start]:
+            del self.positions[contact_id]
+        for index in range(start, len(self.rows)):
+            self.positions[self.rows[index][0]] = index
+
+    def _ensure_loaded(self, count):
+        while len(self.rows) < count and not self.exhausted:
+            page = self.cm.get_contacts_page(
+                self.PAGE_SIZE, self.next_cursor, columns=self.columns,
+                search=self.search, order_by=self.sort_column,
+                descending=self.descending)
+            for row in page.rows:
+                self.positions[row[0]] = len(self.rows)
+                self.rows.append(row)
+            self.next_cursor = page.next_cursor
+            self.exhausted = page.next_cursor is None
+
+    def set_search(self, search_term):
+        self.search = search_term or None
+        self.reload(keep_position=False)
+
+    def sort_by(self, column):
+        """Sort by a column; clicking the current sort column flips it"""
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = column == 'relevance_score'
+        self._update_headings()
+        if self.exhausted:
+            # Everything is already in memory; no need to go back to the
+            # database just to reorder it
+            self._sort_loaded()
+            self.offset = 0
+            self.render()
+        else:
+            self.reload(keep_position=False)
+        self.scroll_to_selected()
+
+    def _update_headings(self):
+        for column in self.columns:
+            text = self.headings[column]
+            if column == self.sort_column:
+                text += " ▼" if self.descending else " ▲"
+            self.tree.heading(self.tree_columns[column], text=text)
+
+    # -- rendering ----------------------------------------------------------
+
+    def render(self):
+        """Replace the Treeview items with the rows in the current window"""
+        window = self.visible_rows + self.BUFFER
+        self._ensure_loaded(self.offset + window)
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+
+        self.tree.delete(*self.tree.get_children())
+        for row in self.rows[self.offset:self.offset + window]:
+            self.tree.insert('', 'end', iid=str(row[0]), values=row)
+        self.tree.yview_moveto(0)
+
+        iid = str(self.selected_id)
+        if self.selected_id is not None and self.tree.exists(iid):
+            self.tree.selection_set(iid)
+            self.tree.focus(iid)
+
+        total = max(self.total, len(self.rows))
+        if total:
+            self.scrollbar.set(self.offset / total,
+                               min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, int(offset))
+        self.render()
+
+    def scroll_to_selected(self):
+        """Bring the selected contact into view if it has been loaded"""
+        index = self.index_of(self.selected_id)
+        if index is not None and not self.offset <= index < self.offset + self.visible_rows:
+            self.scroll_to(index - self.visible_rows // 2)
+
+    def index_of(self, contact_id):
+        return self.positions.get(contact_id)
+
+    def select(self, contact_id):
+        self.selected_id = contact_id
+
+    # -- event handlers -----------------------------------------------------
+
+    def on_resize(self, event):
+        self.row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 30)
+        # One row's worth of height goes to the heading
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            total = max(self.total, len(self.rows))
+            self.scroll_to(float(amount) * total)
+        elif unit == tk.PAGES:
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    def on_key(self, event):
+        """Move the selection through the whole list, not just the window"""
+        index = self.index_of(self.selected_id)
+        if index is None:
+            index = self.offset - 1
+        step = {'Up': -1, 'Down': 1, 'Prior': -self.visible_rows,
+                'Next': self.visible_rows}.get(event.keysym)
+        if step is not None:
+            index += step
+        elif event.keysym == 'Home':
+            index = 0
+        else:
+            self._ensure_loaded(float('inf'))
+            index = len(self.rows) - 1
+
+        self._ensure_loaded(index + 1)
+        index = max(0, min(index, len(self.rows) - 1))
+        if not self.rows:
+            return "break"
+        self.selected_id = self.rows[index][0]
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.visible_rows:
+            self.offset = index - self.visible_rows + 1
+        self.render()
+        return "break"